@@ -9,20 +9,38 @@ db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 
-def create_app():
-    """Application factory pattern for creating Flask app"""
+def create_app(config=None):
+    """Application factory pattern for creating Flask app (config: optional overrides, e.g. for tests)"""
     
     # Create Flask instance
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_object('app.config.Config')
+    app.config.update(config or {})
+    
+    # Fast JSON provider (orjson when installed) that also understands Recipe objects
+    from app.utils.json_provider import AppJSONProvider, encoded_responses
+    app.json = AppJSONProvider(app)
+    encoded_responses.init_app(app)
     
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # Shared pooled HTTP client for TheMealDB API
+    from app.service.http_client import upstream_client
+    upstream_client.init_app(app)
+    
+    # Shared response cache in front of TheMealDB API
+    from app.service.cache import response_cache
+    response_cache.init_app(app)
+    
+    # Prefetched random recipes for /api/recipes/random
+    from app.service.random_pool import random_pool
+    random_pool.init_app(app)
+    
     # Enable CORS for all routes (allow frontend to call API)
     CORS(app, origins=['http://localhost:3000'])  # React dev server
     
@@ -30,10 +48,29 @@ def create_app():
     from app.routes.recipes import recipes_bp
     from app.routes.auth import auth_bp
     from app.routes.favorites import favorites_bp
+    from app.routes.meal_plans import meal_plans_bp
     
     app.register_blueprint(recipes_bp, url_prefix='/api/recipes')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(favorites_bp, url_prefix='/api/favorites')
+    app.register_blueprint(meal_plans_bp, url_prefix='/api/meal-plans')
+    
+    # Background worker that fills in recipe details of new favorites
+    from app.service.favorite_backfill import favorite_backfill
+    favorite_backfill.init_app(app)
+    
+    # In-memory favorite counters behind /api/recipes/popular
+    from app.service.popularity import popularity_tracker
+    popularity_tracker.init_app(app)
+    
+    # Precomputed recipe neighbors behind /api/favorites/recommendations
+    from app.service.recommendations import item_neighbors
+    item_neighbors.init_app(app)
+    
+    # Register CLI commands (flask catalog sync, ...)
+    from app.commands import catalog_cli, favorites_cli
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(favorites_cli)
     
     # Import models to ensure they are registered with SQLAlchemy
     from app import models
@@ -45,10 +82,18 @@ def create_app():
     with app.app_context():
         try:
             db.create_all()
+            # create_all skips existing tables, so add indexes introduced later
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(db.engine, checkfirst=True)
             print("✅ Database tables created successfully")
         except Exception as e:
             print(f"❌ Database creation error: {e}")
     
+    # Load favorite counts before the first /api/recipes/popular request
+    with app.app_context():
+        popularity_tracker.warm()
+    
     # Basic health check route
     @app.route('/')
     def health_check():
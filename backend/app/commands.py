@@ -0,0 +1,73 @@
+import click
+from flask.cli import AppGroup
+
+# Command group for the local recipe catalog: `flask catalog <command>`
+catalog_cli = AppGroup('catalog', help='Manage the local recipe catalog mirrored from TheMealDB.')
+
+
+@catalog_cli.command('sync')
+@click.option('--workers', default=8, show_default=True, help='Concurrent lookup.php requests.')
+def sync_catalog(workers):
+    """Mirror categories, areas and recipes from TheMealDB into local tables"""
+    from app.service.catalog_service import CatalogSync
+
+    stats = CatalogSync(workers=workers).run(log=click.echo)
+    click.echo(
+        f"✅ Catalog synced: {stats['recipes']} recipes, {stats['categories']} categories, "
+        f"{stats['areas']} areas ({stats['failed']} failed)"
+    )
+
+
+# Command group for favorites maintenance: `flask favorites <command>`
+favorites_cli = AppGroup('favorites', help='Favorites maintenance commands.')
+
+
+@favorites_cli.command('prune-idempotency-keys')
+@click.option('--hours', default=24, show_default=True, help='Delete stored responses older than this.')
+def prune_idempotency_keys(hours):
+    """Delete old Idempotency-Key responses"""
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import IdempotencyKey
+
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    click.echo(f"✅ Deleted {deleted} idempotency keys older than {hours} hours")
+
+
+@favorites_cli.command('rebuild-stats')
+def rebuild_favorite_stats():
+    """Recompute the per-day favorites rollup from existing favorites"""
+    from app import db
+    from app.service.favorite_service import rebuild_daily_counts
+
+    rows = rebuild_daily_counts()
+    db.session.commit()
+    click.echo(f"✅ Rebuilt favorites statistics: {rows} user-day rows")
+
+
+@favorites_cli.command('rebuild-popularity')
+def rebuild_popularity():
+    """Recompute per-recipe favorite counts (the /api/recipes/popular leaderboard)"""
+    from app import db
+    from app.models import RecipePopularity
+    from app.service.popularity import popularity_tracker
+
+    popularity_tracker.rebuild()
+    db.session.commit()
+    click.echo(f"✅ Rebuilt popularity counters for {RecipePopularity.query.count()} recipes")
+
+
+@favorites_cli.command('compute-recommendations')
+@click.option('--neighbors', default=None, type=int, help='Neighbors kept per recipe (default: RECOMMENDATION_NEIGHBORS).')
+def compute_recommendations(neighbors):
+    """Precompute item-item similar recipes from all users' favorites"""
+    from flask import current_app
+    from app import db
+    from app.service.recommendations import rebuild_neighbors
+
+    k = neighbors or current_app.config['RECOMMENDATION_NEIGHBORS']
+    recipes = rebuild_neighbors(k=k)
+    db.session.commit()
+    click.echo(f"✅ Computed up to {k} neighbors for {recipes} recipes")
@@ -17,7 +17,67 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
     #Eksternal Konfigurasi API
-    THEMEALDB_BASE_URL = 'https://www.themealdb.com/api/json/v1/1'
+    THEMEALDB_BASE_URL = os.environ.get('THEMEALDB_BASE_URL') or 'https://www.themealdb.com/api/json/v1/1'
+
+    #Mode pencarian /api/recipes/search: 'upstream' (search.php) atau 'local' (indeks full-text lokal)
+    RECIPE_SEARCH_MODE = os.environ.get('RECIPE_SEARCH_MODE', 'upstream')
+
+    #Jumlah maksimum request paralel ke TheMealDB per request (advanced search, batch)
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', 8))
+
+    #Jumlah maksimum ID resep per request batch
+    BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 100))
+
+    #Ukuran halaman maksimum untuk daftar favorit (?limit=)
+    FAVORITES_PAGE_MAX = int(os.environ.get('FAVORITES_PAGE_MAX', 200))
+
+    #Jumlah baris per batch INSERT saat import favorit
+    FAVORITES_IMPORT_BATCH_SIZE = int(os.environ.get('FAVORITES_IMPORT_BATCH_SIZE', 500))
+
+    #Interval (detik) pengecekan ulang favorit yang detail resepnya belum terisi
+    FAVORITE_BACKFILL_SWEEP_SECONDS = int(os.environ.get('FAVORITE_BACKFILL_SWEEP_SECONDS', 60))
+
+    #Interval (detik) penyimpanan counter resep populer ke database
+    POPULARITY_FLUSH_SECONDS = int(os.environ.get('POPULARITY_FLUSH_SECONDS', 30))
+
+    #Jumlah maksimum resep di leaderboard /api/recipes/popular
+    POPULAR_MAX_RESULTS = int(os.environ.get('POPULAR_MAX_RESULTS', 100))
+
+    #Jumlah tetangga (resep mirip) per resep yang disimpan oleh `flask favorites compute-recommendations`
+    RECOMMENDATION_NEIGHBORS = int(os.environ.get('RECOMMENDATION_NEIGHBORS', 20))
+
+    #Interval (detik) pengecekan tabel tetangga hasil batch job terbaru
+    RECOMMENDATION_RELOAD_SECONDS = int(os.environ.get('RECOMMENDATION_RELOAD_SECONDS', 300))
+
+    #Jumlah resep acak yang disiapkan di background untuk /api/recipes/random (0 = nonaktif)
+    RANDOM_POOL_SIZE = int(os.environ.get('RANDOM_POOL_SIZE', 20))
+
+    #Jumlah body JSON yang sudah di-encode untuk kategori, area dan detail resep (0 = nonaktif)
+    ENCODED_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('ENCODED_RESPONSE_CACHE_MAX_ENTRIES', 512))
+
+    #Sumber data resep: 'api' (TheMealDB langsung) atau 'local' (katalog lokal hasil `flask catalog sync`)
+    RECIPE_BACKEND = os.environ.get('RECIPE_BACKEND', 'api')
+
+    #Pengaturan koneksi ke TheMealDB (connection pool, timeout, circuit breaker)
+    THEMEALDB_POOL_SIZE = int(os.environ.get('THEMEALDB_POOL_SIZE', 20))
+    THEMEALDB_CONNECT_TIMEOUT = float(os.environ.get('THEMEALDB_CONNECT_TIMEOUT', 3.05))
+    THEMEALDB_READ_TIMEOUT = float(os.environ.get('THEMEALDB_READ_TIMEOUT', 10))
+    THEMEALDB_BREAKER_THRESHOLD = int(os.environ.get('THEMEALDB_BREAKER_THRESHOLD', 5))
+    THEMEALDB_BREAKER_RESET_SECONDS = float(os.environ.get('THEMEALDB_BREAKER_RESET_SECONDS', 30))
+
+    #Pengaturan cache respons TheMealDB (TTL dalam detik per endpoint, 0 = tidak di-cache)
+    THEMEALDB_CACHE_MAX_ENTRIES = int(os.environ.get('THEMEALDB_CACHE_MAX_ENTRIES', 2048))
+    THEMEALDB_CACHE_MAX_BYTES = int(os.environ.get('THEMEALDB_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    THEMEALDB_CACHE_STALE_SECONDS = int(os.environ.get('THEMEALDB_CACHE_STALE_SECONDS', 3600))
+    THEMEALDB_CACHE_DEFAULT_TTL = 300
+    THEMEALDB_CACHE_TTLS = {
+        'categories.php': 12 * 3600,
+        'list.php': 12 * 3600,
+        'lookup.php': 3600,
+        'filter.php': 30 * 60,
+        'search.php': 10 * 60,
+        'random.php': 0
+    }
 
     #Pengaturan Aplikasi
     DEBUG = True
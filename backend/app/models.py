@@ -68,7 +68,18 @@ class Favorite(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Unique constraint: one user cannot favorite same recipe twice
-    __table_args__ = (db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe'),)
+    # Composite index serves the newest-first keyset pagination of a user's favorites
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe'),
+        db.Index('ix_favorites_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    # recipe_name of a favorite whose recipe details are still being looked up
+    PENDING_NAME = ''
+    
+    @property
+    def is_pending(self):
+        return self.recipe_name == self.PENDING_NAME
     
     def to_dict(self):
         """Convert favorite object to dictionary"""
@@ -77,12 +88,62 @@ class Favorite(db.Model):
             'recipe_id': self.recipe_id,
             'recipe_name': self.recipe_name,
             'recipe_image': self.recipe_image,
+            'pending': self.is_pending,
             'created_at': self.created_at.isoformat()
         }
     
     def __repr__(self):
         return f'<Favorite {self.recipe_name} by User {self.user_id}>'
 
+class FavoriteDailyCount(db.Model):
+    """Per-user, per-day count of favorites (rollup kept in step with the favorites table)"""
+    
+    __tablename__ = 'favorite_daily_counts'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # UTC date of Favorite.created_at
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        """Convert daily count to dictionary"""
+        return {
+            'date': self.day.isoformat(),
+            'count': self.count
+        }
+    
+    def __repr__(self):
+        return f'<FavoriteDailyCount {self.day} {self.count} for User {self.user_id}>'
+
+class RecipePopularity(db.Model):
+    """Favorite count per recipe across all users (persisted copy of the popularity counters)"""
+    
+    __tablename__ = 'recipe_popularity'
+    
+    recipe_id = db.Column(db.String(50), primary_key=True)
+    favorite_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    recipe_name = db.Column(db.String(200))
+    recipe_image = db.Column(db.String(500))
+    category = db.Column(db.String(100))
+    area = db.Column(db.String(100))
+    details_checked_at = db.Column(db.DateTime)  # last local lookup of missing details
+    
+    def __repr__(self):
+        return f'<RecipePopularity {self.recipe_id}: {self.favorite_count}>'
+
+class RecipeNeighbor(db.Model):
+    """Precomputed item-item similarity: the top neighbors of each recipe by co-favoriting"""
+    
+    __tablename__ = 'recipe_neighbors'
+    
+    recipe_id = db.Column(db.String(50), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)  # 0 = most similar
+    neighbor_id = db.Column(db.String(50), nullable=False)
+    score = db.Column(db.Float, nullable=False)  # cosine similarity of the two recipes' favoriting users
+    computed_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<RecipeNeighbor {self.recipe_id} -> {self.neighbor_id} ({self.score:.3f})>'
+
 class MealPlan(db.Model):
     """Meal planning model"""
     
@@ -97,6 +158,13 @@ class MealPlan(db.Model):
     meal_type = db.Column(db.String(20), nullable=False)  # breakfast, lunch, dinner
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Composite index serves date range reads of a user's plan
+    __table_args__ = (
+        db.Index('ix_meal_plans_user_date', 'user_id', 'planned_date'),
+    )
+    
+    MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+    
     def to_dict(self):
         """Convert meal plan object to dictionary"""
         return {
@@ -110,4 +178,160 @@ class MealPlan(db.Model):
         }
     
     def __repr__(self):
-        return f'<MealPlan {self.recipe_name} for {self.planned_date}>'
\ No newline at end of file
+        return f'<MealPlan {self.recipe_name} for {self.planned_date}>'
+
+# Association table between catalog recipes and tags
+catalog_recipe_tags = db.Table(
+    'catalog_recipe_tags',
+    db.Column('recipe_id', db.String(50), db.ForeignKey('catalog_recipes.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('catalog_tags.id'), primary_key=True)
+)
+
+class CatalogCategory(db.Model):
+    """Recipe category mirrored from TheMealDB"""
+    
+    __tablename__ = 'catalog_categories'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    thumb = db.Column(db.String(500))
+    description = db.Column(db.Text)
+    
+    def to_api_dict(self):
+        """Convert to TheMealDB categories.php shape"""
+        return {
+            'idCategory': str(self.id),
+            'strCategory': self.name,
+            'strCategoryThumb': self.thumb,
+            'strCategoryDescription': self.description
+        }
+    
+    def __repr__(self):
+        return f'<CatalogCategory {self.name}>'
+
+class CatalogArea(db.Model):
+    """Cuisine/area mirrored from TheMealDB"""
+    
+    __tablename__ = 'catalog_areas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<CatalogArea {self.name}>'
+
+class CatalogIngredient(db.Model):
+    """Normalized ingredient name"""
+    
+    __tablename__ = 'catalog_ingredients'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    normalized_name = db.Column(db.String(100), unique=True, nullable=False, index=True)  # lowercase, for lookups
+    
+    def __repr__(self):
+        return f'<CatalogIngredient {self.name}>'
+
+class CatalogTag(db.Model):
+    """Recipe tag (from strTags)"""
+    
+    __tablename__ = 'catalog_tags'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<CatalogTag {self.name}>'
+
+class CatalogRecipe(db.Model):
+    """Recipe mirrored from TheMealDB (id is TheMealDB idMeal)"""
+    
+    __tablename__ = 'catalog_recipes'
+    
+    id = db.Column(db.String(50), primary_key=True)
+    name = db.Column(db.String(200), nullable=False, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('catalog_categories.id'), index=True)
+    area_id = db.Column(db.Integer, db.ForeignKey('catalog_areas.id'), index=True)
+    instructions = db.Column(db.Text)
+    image = db.Column(db.String(500))
+    youtube = db.Column(db.String(500))
+    source = db.Column(db.String(500))
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    category = db.relationship('CatalogCategory', lazy='joined')
+    area = db.relationship('CatalogArea', lazy='joined')
+    tags = db.relationship('CatalogTag', secondary=catalog_recipe_tags, lazy='selectin')
+    ingredients = db.relationship(
+        'CatalogRecipeIngredient',
+        backref='recipe',
+        lazy='selectin',
+        cascade='all, delete-orphan',
+        order_by='CatalogRecipeIngredient.position'
+    )
+    
+    def to_summary_dict(self):
+        """Convert to TheMealDB filter.php shape"""
+        return {
+            'strMeal': self.name,
+            'strMealThumb': self.image,
+            'idMeal': self.id
+        }
+    
+    def to_api_dict(self):
+        """Convert to TheMealDB search.php/lookup.php meal shape"""
+        meal = {
+            'idMeal': self.id,
+            'strMeal': self.name,
+            'strCategory': self.category.name if self.category else None,
+            'strArea': self.area.name if self.area else None,
+            'strInstructions': self.instructions,
+            'strMealThumb': self.image,
+            'strTags': ','.join(tag.name for tag in self.tags) or None,
+            'strYoutube': self.youtube,
+            'strSource': self.source
+        }
+        for i in range(1, 21):
+            meal[f'strIngredient{i}'] = ''
+            meal[f'strMeasure{i}'] = ''
+        for item in self.ingredients:
+            meal[f'strIngredient{item.position}'] = item.ingredient.name
+            meal[f'strMeasure{item.position}'] = item.measure or ''
+        return meal
+    
+    def __repr__(self):
+        return f'<CatalogRecipe {self.name}>'
+
+class CatalogRecipeIngredient(db.Model):
+    """Ingredient line of a catalog recipe (ingredient + measure)"""
+    
+    __tablename__ = 'catalog_recipe_ingredients'
+    
+    recipe_id = db.Column(db.String(50), db.ForeignKey('catalog_recipes.id'), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)  # 1..20, same as strIngredientN
+    ingredient_id = db.Column(db.Integer, db.ForeignKey('catalog_ingredients.id'), nullable=False, index=True)
+    measure = db.Column(db.String(100))
+    
+    ingredient = db.relationship('CatalogIngredient', lazy='joined')
+    
+    def __repr__(self):
+        return f'<CatalogRecipeIngredient {self.recipe_id}#{self.position}>'
+
+class IdempotencyKey(db.Model):
+    """Stored response of a write request sent with an Idempotency-Key header"""
+    
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    endpoint = db.Column(db.String(200), nullable=False)  # e.g. 'POST /api/favorites/toggle'
+    status_code = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # One stored response per user and key
+    __table_args__ = (db.UniqueConstraint('user_id', 'key', name='unique_user_idempotency_key'),)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key} by User {self.user_id}>'
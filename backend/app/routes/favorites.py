@@ -1,17 +1,38 @@
-from flask import Blueprint, request, jsonify
+import itertools
+import json
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import User, Favorite
+from app.models import User, Favorite, RecipePopularity
 from app.service.recipe_service import RecipeService
-from sqlalchemy.exc import IntegrityError
+from app.service.favorite_backfill import favorite_backfill
+from app.service.recommendations import item_neighbors
+from app.service.favorite_service import (
+    build_favorite_values, add_favorite, remove_favorite,
+    find_idempotent_response, remember_response, IdempotencyKeyInUse,
+    favorites_query, favorites_page, iter_favorites, import_favorites,
+    favorites_stats
+)
 
 # Create blueprint for favorites routes
 favorites_bp = Blueprint('favorites', __name__)
 
+def idempotency_key():
+    """Idempotency-Key header of the current request (None if not sent)"""
+    key = request.headers.get('Idempotency-Key', '').strip()
+    return key[:255] or None
+
+def idempotent_request_endpoint():
+    return f'{request.method} {request.path}'
+
 @favorites_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_user_favorites():
-    """Get all favorite recipes for current user"""
+    """Get favorite recipes for current user
+
+    Without parameters all favorites are returned. ?limit=N[&cursor=...] returns
+    one page plus next_cursor, ?format=ndjson streams one favorite per line.
+    """
     try:
         # Get current user
         current_user_id = get_jwt_identity()
@@ -20,22 +41,51 @@ def get_user_favorites():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get user's favorites
-        favorites = Favorite.query.filter_by(user_id=current_user_id).order_by(Favorite.created_at.desc()).all()
+        # Stream every favorite as NDJSON without loading them all
+        if request.args.get('format') == 'ndjson':
+            def generate():
+                for favorite in iter_favorites(current_user_id):
+                    yield json.dumps(favorite.to_dict()) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        # Get user's favorites (one page when limit/cursor are given)
+        cursor = request.args.get('cursor')
+        next_cursor = None
+        
+        # Any ?limit (even 0 or negative) means paging, clamped to 1..FAVORITES_PAGE_MAX
+        if 'limit' in request.args or cursor:
+            limit = max(1, min(request.args.get('limit', 50, type=int), current_app.config['FAVORITES_PAGE_MAX']))
+            favorites, next_cursor = favorites_page(current_user_id, limit, cursor)
+        else:
+            favorites = favorites_query(current_user_id).all()
+        data = [fav.to_dict() for fav in favorites]
+        
+        # ?expand=details: attach full recipe details, fetched in bulk
+        if request.args.get('expand') == 'details' and data:
+            service = RecipeService()
+            result = service.get_recipes_by_ids([fav['recipe_id'] for fav in data])
+            recipes = {recipe['id']: recipe for recipe in result['data']}
+            for fav in data:
+                fav['recipe'] = recipes.get(fav['recipe_id'])
         
         return jsonify({
             'message': f'Found {len(favorites)} favorite recipes',
-            'data': [fav.to_dict() for fav in favorites],
-            'count': len(favorites)
+            'data': data,
+            'count': len(favorites),
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     except Exception as e:
         return jsonify({'error': 'Failed to get favorites'}), 500
 
 @favorites_bp.route('/add', methods=['POST'])
 @jwt_required()
 def add_to_favorites():
-    """Add a recipe to user's favorites"""
+    """Add a recipe to user's favorites (supports Idempotency-Key header)"""
     try:
         # Get current user
         current_user_id = get_jwt_identity()
@@ -44,6 +94,13 @@ def add_to_favorites():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        # Replay the stored response of a retried request
+        key = idempotency_key()
+        if key:
+            stored = find_idempotent_response(current_user_id, key, idempotent_request_endpoint())
+            if stored:
+                return jsonify(stored[0]), stored[1]
+        
         # Get request data
         data = request.get_json()
         
@@ -52,40 +109,113 @@ def add_to_favorites():
         
         recipe_id = data['recipe_id']
         
-        # Get recipe details from TheMealDB API
-        service = RecipeService()
-        recipe_result = service.get_recipe_by_id(recipe_id)
-        
-        if not recipe_result['success']:
+        # Recipe details come from local data or the backfill worker
+        values = build_favorite_values(current_user_id, recipe_id)
+        if values is None:
             return jsonify({'error': 'Recipe not found or invalid'}), 404
         
-        recipe_data = recipe_result['data']
+        # Single INSERT ... ON CONFLICT DO NOTHING
+        favorite = add_favorite(values)
         
-        # Create favorite entry
-        favorite = Favorite(
-            user_id=current_user_id,
-            recipe_id=recipe_id,
-            recipe_name=recipe_data['name'],
-            recipe_image=recipe_data['image']
-        )
+        if favorite is None:
+            payload, status = {'error': 'Recipe is already in your favorites'}, 409
+        else:
+            payload, status = {
+                'message': 'Recipe added to favorites successfully',
+                'data': favorite.to_dict()
+            }, 201
         
-        # Save to database
-        db.session.add(favorite)
+        needs_backfill = favorite is not None and favorite.is_pending
+        if key:
+            remember_response(current_user_id, key, idempotent_request_endpoint(), payload, status)
         db.session.commit()
         
-        return jsonify({
-            'message': 'Recipe added to favorites successfully',
-            'data': favorite.to_dict()
-        }), 201
+        if needs_backfill:
+            favorite_backfill.enqueue(values['recipe_id'])
         
-    except IntegrityError:
+        return jsonify(payload), status
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 422
+    
+    except IdempotencyKeyInUse:
+        # Same Idempotency-Key sent concurrently, the other request stored its response
         db.session.rollback()
-        return jsonify({'error': 'Recipe is already in your favorites'}), 409
+        return jsonify({'error': 'A request with this Idempotency-Key is already being processed'}), 409
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to add recipe to favorites'}), 500
 
+@favorites_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_user_favorites():
+    """Bulk import favorites from an NDJSON body (one recipe ID or favorite object per line)"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Read the body line by line instead of loading it all
+        stats, pending_ids = import_favorites(
+            current_user_id,
+            request.stream,
+            batch_size=current_app.config['FAVORITES_IMPORT_BATCH_SIZE']
+        )
+        
+        for recipe_id in dict.fromkeys(pending_ids):
+            favorite_backfill.enqueue(recipe_id)
+        
+        return jsonify({
+            'message': f'Imported {stats["imported"]} favorite recipes',
+            'data': stats
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import favorites'}), 500
+
+@favorites_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_user_favorites():
+    """Export all favorites as NDJSON (the format accepted by /import)"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Run the query before streaming so a database error is still a 500, not a cut-off file
+        favorites = iter_favorites(current_user_id)
+        first = next(favorites, None)
+        
+        def generate():
+            if first is None:
+                return
+            for favorite in itertools.chain([first], favorites):
+                yield json.dumps({
+                    'recipe_id': favorite.recipe_id,
+                    'recipe_name': favorite.recipe_name,
+                    'recipe_image': favorite.recipe_image,
+                    'created_at': favorite.created_at.isoformat()
+                }) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': 'attachment; filename=favorites.ndjson'}
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to export favorites'}), 500
+
 @favorites_bp.route('/remove/<recipe_id>', methods=['DELETE'])
 @jwt_required()
 def remove_from_favorites(recipe_id):
@@ -94,17 +224,12 @@ def remove_from_favorites(recipe_id):
         # Get current user
         current_user_id = get_jwt_identity()
         
-        # Find the favorite entry
-        favorite = Favorite.query.filter_by(
-            user_id=current_user_id,
-            recipe_id=recipe_id
-        ).first()
+        # Single DELETE statement
+        removed = remove_favorite(current_user_id, recipe_id)
         
-        if not favorite:
+        if not removed:
             return jsonify({'error': 'Recipe not found in favorites'}), 404
         
-        # Remove from database
-        db.session.delete(favorite)
         db.session.commit()
         
         return jsonify({
@@ -115,6 +240,53 @@ def remove_from_favorites(recipe_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to remove recipe from favorites'}), 500
 
+@favorites_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations():
+    """Recommend recipes favorited by users with similar taste (precomputed item-item neighbors)"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        
+        liked_ids = [
+            row.recipe_id for row in
+            Favorite.query.with_entities(Favorite.recipe_id).filter_by(user_id=current_user_id).all()
+        ]
+        recommended = item_neighbors.recommend(liked_ids, limit=limit)
+        
+        # Every neighbor is a favorited recipe, so its details are in the popularity table
+        recipe_ids = [recipe_id for recipe_id, _, _ in recommended]
+        details = {
+            row.recipe_id: {'name': row.recipe_name, 'image': row.recipe_image, 'category': row.category, 'area': row.area}
+            for row in RecipePopularity.query.filter(RecipePopularity.recipe_id.in_(recipe_ids)).all()
+        }
+        missing = [recipe_id for recipe_id in recipe_ids if not details.get(recipe_id, {}).get('name')]
+        if missing:
+            details.update(RecipeService().peek_recipe_summaries(missing))
+        
+        recipes = []
+        for recipe_id, score, based_on in recommended:
+            recipe = details.get(recipe_id) or {}
+            recipes.append({
+                'idMeal': recipe_id,
+                'strMeal': recipe.get('name'),
+                'strMealThumb': recipe.get('image'),
+                'strCategory': recipe.get('category'),
+                'strArea': recipe.get('area'),
+                'score': round(score, 4),
+                'based_on': based_on
+            })
+        
+        return jsonify({
+            'message': 'Recommendations retrieved successfully',
+            'data': recipes,
+            'count': len(recipes)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get recommendations'}), 500
+
 @favorites_bp.route('/check/<recipe_id>', methods=['GET'])
 @jwt_required()
 def check_favorite_status(recipe_id):
@@ -143,7 +315,10 @@ def check_favorite_status(recipe_id):
 @favorites_bp.route('/toggle', methods=['POST'])
 @jwt_required()
 def toggle_favorite():
-    """Toggle favorite status of a recipe (add if not favorite, remove if favorite)"""
+    """Toggle favorite status of a recipe (add if not favorite, remove if favorite)
+
+    Supports the Idempotency-Key header so a retried toggle does not flip back.
+    """
     try:
         # Get current user
         current_user_id = get_jwt_identity()
@@ -152,6 +327,13 @@ def toggle_favorite():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        # Replay the stored response of a retried request
+        key = idempotency_key()
+        if key:
+            stored = find_idempotent_response(current_user_id, key, idempotent_request_endpoint())
+            if stored:
+                return jsonify(stored[0]), stored[1]
+        
         # Get request data
         data = request.get_json()
         
@@ -159,52 +341,56 @@ def toggle_favorite():
             return jsonify({'error': 'Recipe ID is required'}), 400
         
         recipe_id = data['recipe_id']
+        favorite = None
         
-        # Check if already in favorites
-        existing_favorite = Favorite.query.filter_by(
-            user_id=current_user_id,
-            recipe_id=recipe_id
-        ).first()
-        
-        if existing_favorite:
-            # Remove from favorites
-            db.session.delete(existing_favorite)
-            db.session.commit()
-            
-            return jsonify({
+        # Try removing first; if nothing was there, insert instead
+        if remove_favorite(current_user_id, recipe_id):
+            payload, status = {
                 'message': 'Recipe removed from favorites',
                 'action': 'removed',
                 'is_favorite': False
-            }), 200
+            }, 200
         else:
-            # Add to favorites
-            # Get recipe details from API
-            service = RecipeService()
-            recipe_result = service.get_recipe_by_id(recipe_id)
-            
-            if not recipe_result['success']:
+            values = build_favorite_values(current_user_id, recipe_id)
+            if values is None:
+                db.session.rollback()
                 return jsonify({'error': 'Recipe not found or invalid'}), 404
             
-            recipe_data = recipe_result['data']
-            
-            # Create favorite entry
-            favorite = Favorite(
-                user_id=current_user_id,
-                recipe_id=recipe_id,
-                recipe_name=recipe_data['name'],
-                recipe_image=recipe_data['image']
-            )
-            
-            db.session.add(favorite)
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Recipe added to favorites',
-                'action': 'added',
-                'is_favorite': True,
-                'data': favorite.to_dict()
-            }), 201
+            favorite = add_favorite(values)
+            if favorite is None:
+                # A concurrent request added it between our DELETE and INSERT
+                payload, status = {
+                    'message': 'Recipe is already in your favorites',
+                    'action': 'none',
+                    'is_favorite': True
+                }, 200
+            else:
+                payload, status = {
+                    'message': 'Recipe added to favorites',
+                    'action': 'added',
+                    'is_favorite': True,
+                    'data': favorite.to_dict()
+                }, 201
+        
+        needs_backfill = favorite is not None and favorite.is_pending
+        if key:
+            remember_response(current_user_id, key, idempotent_request_endpoint(), payload, status)
+        db.session.commit()
+        
+        if needs_backfill:
+            favorite_backfill.enqueue(values['recipe_id'])
+        
+        return jsonify(payload), status
         
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 422
+    
+    except IdempotencyKeyInUse:
+        # Same Idempotency-Key sent concurrently, the other request stored its response
+        db.session.rollback()
+        return jsonify({'error': 'A request with this Idempotency-Key is already being processed'}), 409
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to toggle favorite status'}), 500
@@ -217,26 +403,14 @@ def get_favorites_stats():
         # Get current user
         current_user_id = get_jwt_identity()
         
-        # Count favorites
-        total_favorites = Favorite.query.filter_by(user_id=current_user_id).count()
-        
-        # Get favorites grouped by date (recent activity)
-        from sqlalchemy import func
-        recent_favorites = db.session.query(
-            func.date(Favorite.created_at).label('date'),
-            func.count(Favorite.id).label('count')
-        ).filter_by(user_id=current_user_id).group_by(
-            func.date(Favorite.created_at)
-        ).order_by(func.date(Favorite.created_at).desc()).limit(7).all()
+        # Totals come from the daily rollup instead of scanning favorites
+        total_favorites, recent_favorites = favorites_stats(current_user_id)
         
         return jsonify({
             'message': 'Favorites statistics retrieved successfully',
             'data': {
                 'total_favorites': total_favorites,
-                'recent_activity': [
-                    {'date': str(item.date), 'count': item.count} 
-                    for item in recent_favorites
-                ]
+                'recent_activity': [item.to_dict() for item in recent_favorites]
             }
         }), 200
         
@@ -0,0 +1,172 @@
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.models import User, MealPlan
+from app.service.meal_plan_service import (
+    parse_date, meal_plans_between, build_week_rows, replace_week, auto_plan_week,
+    shopping_list
+)
+
+# Create blueprint for meal plan routes
+meal_plans_bp = Blueprint('meal_plans', __name__)
+
+# Longest range a single GET may cover
+MAX_RANGE_DAYS = 93
+
+def requested_range():
+    """(start, end) from ?start and ?end (YYYY-MM-DD, default: this week), raises ValueError"""
+    today = date.today()
+    start = parse_date(request.args['start']) if request.args.get('start') else today - timedelta(days=today.weekday())
+    end = parse_date(request.args['end']) if request.args.get('end') else start + timedelta(days=6)
+    if end < start or (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'end must be on or after start and at most {MAX_RANGE_DAYS} days later')
+    return start, end
+
+@meal_plans_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_meal_plans():
+    """Get planned meals between ?start and ?end (YYYY-MM-DD, default: this week)"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        
+        try:
+            start, end = requested_range()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        plans = meal_plans_between(current_user_id, start, end)
+        
+        return jsonify({
+            'message': 'Meal plans retrieved successfully',
+            'data': [plan.to_dict() for plan in plans],
+            'count': len(plans)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get meal plans'}), 500
+
+@meal_plans_bp.route('/shopping-list', methods=['GET'])
+@jwt_required()
+def get_shopping_list():
+    """Get the combined ingredients of all meals planned between ?start and ?end"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        
+        try:
+            start, end = requested_range()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        items, unavailable = shopping_list(current_user_id, start, end)
+        
+        return jsonify({
+            'message': 'Shopping list generated successfully',
+            'data': items,
+            'count': len(items),
+            'unavailable_recipes': unavailable
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to generate shopping list'}), 500
+
+@meal_plans_bp.route('/week/<start>', methods=['PUT'])
+@jwt_required()
+def replace_meal_plan_week(start):
+    """Replace the whole week starting at <start> with the given meals (one transaction)"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        meals = data.get('meals')
+        if not isinstance(meals, list):
+            return jsonify({'error': 'meals must be a list'}), 400
+        
+        try:
+            start = parse_date(start)
+            rows = build_week_rows(current_user_id, start, meals)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 503
+        
+        replace_week(current_user_id, start, rows)
+        db.session.commit()
+        
+        plans = meal_plans_between(current_user_id, start, start + timedelta(days=6))
+        return jsonify({
+            'message': 'Meal plan week saved successfully',
+            'data': [plan.to_dict() for plan in plans],
+            'count': len(plans)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save meal plan week'}), 500
+
+@meal_plans_bp.route('/week/<start>/auto', methods=['POST'])
+@jwt_required()
+def auto_plan_meal_plan_week(start):
+    """Fill the week starting at <start> with recipes from favorites and the local catalog"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        meal_types = data.get('meal_types') or list(MealPlan.MEAL_TYPES)
+        if not isinstance(meal_types, list) or not set(meal_types) <= set(MealPlan.MEAL_TYPES):
+            return jsonify({'error': f'meal_types must be a list of {", ".join(MealPlan.MEAL_TYPES)}'}), 400
+        
+        try:
+            start = parse_date(start)
+            rows = auto_plan_week(
+                current_user_id, start,
+                meal_types=[meal_type for meal_type in MealPlan.MEAL_TYPES if meal_type in meal_types]
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        replace_week(current_user_id, start, rows)
+        db.session.commit()
+        
+        plans = meal_plans_between(current_user_id, start, start + timedelta(days=6))
+        return jsonify({
+            'message': 'Meal plan week generated successfully',
+            'data': [plan.to_dict() for plan in plans],
+            'count': len(plans)
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to generate meal plan week'}), 500
+
+@meal_plans_bp.route('/<int:plan_id>', methods=['DELETE'])
+@jwt_required()
+def delete_meal_plan(plan_id):
+    """Remove one planned meal"""
+    try:
+        # Get current user
+        current_user_id = get_jwt_identity()
+        
+        deleted = MealPlan.query.filter_by(id=plan_id, user_id=int(current_user_id)).delete(synchronize_session=False)
+        if not deleted:
+            return jsonify({'error': 'Meal plan not found'}), 404
+        
+        db.session.commit()
+        
+        return jsonify({'message': 'Meal plan removed successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to remove meal plan'}), 500
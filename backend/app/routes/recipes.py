@@ -1,29 +1,61 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.service.recipe_service import RecipeService
+from app.service.cache import response_cache
+from app.service.http_client import upstream_client
+from app.service.singleflight import upstream_flights
+from app.service.random_pool import random_pool
+from app.service.pantry_index import ingredient_index
+from app.service.suggest_index import suggest_index
+from app.service.similar_index import similar_index
+from app.service.popularity import popularity_tracker
+from app.utils.json_provider import encoded_responses
+from app.utils.helpers import SUMMARY_FIELDS, RANKING_FIELDS, parse_fields, project_fields
 
 # Create blueprint for recipe routes
 recipes_bp = Blueprint('recipes', __name__)
 
+# Summary shape of processed recipes (batch lookups)
+RECIPE_SUMMARY_FIELDS = ('id', 'name', 'image', 'category', 'area')
+
+def list_data(items, summary=SUMMARY_FIELDS, default='summary'):
+    """Project list results to ?fields=a,b (or 'summary': compact shape plus ranking info, 'all': untouched)
+
+    Unknown field names are ignored rather than rejected, so clients can ask
+    for fields that only some endpoints return.
+    """
+    requested = request.args.get('fields', '').strip() or default
+    if requested == 'all':
+        return items
+    if requested == 'summary':
+        return project_fields(items, summary, keep=RANKING_FIELDS)
+    return project_fields(items, parse_fields(requested))
+
 @recipes_bp.route('/search', methods=['GET'])
 def search_recipes():
-    """Search recipes by name"""
+    """Search recipes by name (upstream) or full-text over the local index (?mode=local)"""
     try:
         # Get query parameter
         query = request.args.get('q', '').strip()
+        mode = request.args.get('mode', current_app.config['RECIPE_SEARCH_MODE']).strip().lower()
         
         if not query:
             return jsonify({'error': 'Query parameter "q" is required'}), 400
         
         # Use recipe service
         service = RecipeService()
-        result = service.search_by_name(query)
+        if mode == 'local':
+            limit = min(request.args.get('limit', 20, type=int), 100)
+            result = service.full_text_search(query, limit=limit)
+        else:
+            result = service.search_by_name(query)
         
         if result['success']:
             return jsonify({
                 'message': f'Found {result["count"]} recipes',
-                'data': result['data'],
-                'count': result['count']
+                'data': list_data(result['data']),
+                'count': result['count'],
+                'fuzzy': result.get('fuzzy', False)
             }), 200
         else:
             return jsonify({'error': result['error']}), 500
@@ -39,7 +71,7 @@ def get_recipe_detail(recipe_id):
         result = service.get_recipe_by_id(recipe_id)
         
         if result['success']:
-            return jsonify({
+            return encoded_responses.response(f'recipe:{recipe_id}', result['data'], {
                 'message': 'Recipe found',
                 'data': result['data']
             }), 200
@@ -49,6 +81,63 @@ def get_recipe_detail(recipe_id):
     except Exception as e:
         return jsonify({'error': 'Failed to get recipe details'}), 500
 
+@recipes_bp.route('/<recipe_id>/similar', methods=['GET'])
+def get_similar_recipes(recipe_id):
+    """Get recipes with similar ingredients, category and area"""
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), similar_index.k)
+        
+        similar_index.ensure_fresh()
+        results = similar_index.similar(recipe_id, limit=limit)
+        if results is None:
+            # Not indexed yet: looking it up adds it to the index
+            result = RecipeService().get_recipe_by_id(recipe_id)
+            if not result['success']:
+                return jsonify({'error': result['error']}), 404
+            results = similar_index.similar(recipe_id, limit=limit) or []
+        
+        return jsonify({
+            'message': 'Similar recipes retrieved successfully',
+            'data': list_data(results),
+            'count': len(results)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get similar recipes'}), 500
+
+@recipes_bp.route('/batch', methods=['GET', 'POST'])
+def get_recipes_batch():
+    """Get detailed recipe information for many IDs (?ids=1,2,3 or JSON {"ids": [...]})"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            recipe_ids = data.get('ids') or []
+            if not isinstance(recipe_ids, list):
+                return jsonify({'error': '"ids" must be a list'}), 400
+        else:
+            recipe_ids = [item for item in request.args.get('ids', '').split(',') if item.strip()]
+        
+        if not recipe_ids:
+            return jsonify({'error': 'At least one recipe ID is required'}), 400
+        
+        max_ids = current_app.config['BATCH_MAX_IDS']
+        if len(recipe_ids) > max_ids:
+            return jsonify({'error': f'At most {max_ids} recipe IDs per request'}), 400
+        
+        service = RecipeService()
+        result = service.get_recipes_by_ids(recipe_ids)
+        
+        return jsonify({
+            'message': f'Found {result["count"]} recipes',
+            'data': list_data(result['data'], summary=RECIPE_SUMMARY_FIELDS, default='all'),
+            'count': result['count'],
+            'not_found': result['not_found'],
+            'failed': result['failed']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get recipes'}), 500
+
 @recipes_bp.route('/filter/ingredient', methods=['GET'])
 def filter_by_ingredient():
     """Filter recipes by main ingredient"""
@@ -64,7 +153,7 @@ def filter_by_ingredient():
         if result['success']:
             return jsonify({
                 'message': f'Found {result["count"]} recipes with {ingredient}',
-                'data': result['data'],
+                'data': list_data(result['data']),
                 'count': result['count']
             }), 200
         else:
@@ -88,7 +177,7 @@ def filter_by_category():
         if result['success']:
             return jsonify({
                 'message': f'Found {result["count"]} {category} recipes',
-                'data': result['data'],
+                'data': list_data(result['data']),
                 'count': result['count']
             }), 200
         else:
@@ -112,7 +201,7 @@ def filter_by_area():
         if result['success']:
             return jsonify({
                 'message': f'Found {result["count"]} {area} recipes',
-                'data': result['data'],
+                'data': list_data(result['data']),
                 'count': result['count']
             }), 200
         else:
@@ -129,7 +218,7 @@ def get_categories():
         result = service.get_categories()
         
         if result['success']:
-            return jsonify({
+            return encoded_responses.response('categories', result['data'], {
                 'message': 'Categories retrieved successfully',
                 'data': result['data']
             }), 200
@@ -147,7 +236,7 @@ def get_areas():
         result = service.get_areas()
         
         if result['success']:
-            return jsonify({
+            return encoded_responses.response('areas', result['data'], {
                 'message': 'Areas retrieved successfully',
                 'data': result['data']
             }), 200
@@ -175,59 +264,123 @@ def get_random_recipe():
     except Exception as e:
         return jsonify({'error': 'Failed to get random recipe'}), 500
 
+@recipes_bp.route('/pantry', methods=['GET'])
+def pantry_match():
+    """Find recipes that can be cooked with the given ingredients"""
+    try:
+        have = [item.strip() for item in request.args.get('have', '').split(',') if item.strip()]
+        
+        if not have:
+            return jsonify({'error': 'Query parameter "have" is required'}), 400
+        
+        missing_max = request.args.get('missing_max', type=int)
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        
+        ingredient_index.ensure_fresh()
+        results = ingredient_index.match(have, missing_max=missing_max, limit=limit)
+        
+        return jsonify({
+            'message': f'Found {len(results)} recipes',
+            'data': results,
+            'count': len(results)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Pantry search failed'}), 500
+
+@recipes_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """Autocomplete recipe, ingredient, category and area names"""
+    try:
+        prefix = request.args.get('prefix', '').strip()
+        
+        if not prefix:
+            return jsonify({'error': 'Query parameter "prefix" is required'}), 400
+        
+        kinds = [kind.strip() for kind in request.args.get('types', '').split(',') if kind.strip()]
+        limit = min(request.args.get('limit', 10, type=int), 50)
+        
+        suggest_index.ensure_fresh()
+        results = suggest_index.suggest(prefix, kinds=kinds or None, limit=limit)
+        
+        return jsonify({
+            'message': f'Found {len(results)} suggestions',
+            'data': results,
+            'count': len(results)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Suggest failed'}), 500
+
+@recipes_bp.route('/popular', methods=['GET'])
+def get_popular_recipes():
+    """Most favorited recipes overall, or within a category and/or area"""
+    try:
+        category = request.args.get('category', '').strip()
+        area = request.args.get('area', '').strip()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), current_app.config['POPULAR_MAX_RESULTS'])
+        
+        recipes = popularity_tracker.top(limit=limit, category=category or None, area=area or None)
+        
+        return jsonify({
+            'message': 'Popular recipes retrieved successfully',
+            'data': list_data(recipes),
+            'count': len(recipes)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get popular recipes'}), 500
+
+@recipes_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get response cache, request coalescing, random pool and upstream circuit breaker counters"""
+    return jsonify({
+        'message': 'Cache statistics retrieved successfully',
+        'data': {
+            'cache': response_cache.stats(),
+            'single_flight': upstream_flights.stats(),
+            'circuit_breaker': upstream_client.breaker.to_dict(),
+            'random_pool': random_pool.stats(),
+            'encoded_responses': encoded_responses.stats()
+        }
+    }), 200
+
 @recipes_bp.route('/advanced-search', methods=['GET'])
 def advanced_search():
-    """Advanced search with multiple filters"""
+    """Advanced search with multiple filters (all filters are applied together)"""
     try:
         # Get all possible query parameters
         query = request.args.get('q', '').strip()
-        ingredient = request.args.get('ingredient', '').strip()
         category = request.args.get('category', '').strip()
         area = request.args.get('area', '').strip()
+        match_all = request.args.get('match', 'all').strip().lower() != 'any'
         
-        service = RecipeService()
-        results = []
-        
-        # Search by name if query provided
-        if query:
-            result = service.search_by_name(query)
-            if result['success']:
-                results.extend(result['data'])
-        
-        # Filter by ingredient if provided
-        elif ingredient:
-            result = service.search_by_ingredient(ingredient)
-            if result['success']:
-                results.extend(result['data'])
-        
-        # Filter by category if provided
-        elif category:
-            result = service.filter_by_category(category)
-            if result['success']:
-                results.extend(result['data'])
-        
-        # Filter by area if provided
-        elif area:
-            result = service.filter_by_area(area)
-            if result['success']:
-                results.extend(result['data'])
+        # Ingredients may be repeated (?ingredient=a&ingredient=b) or comma separated
+        ingredients = []
+        for value in request.args.getlist('ingredient'):
+            ingredients.extend(item.strip() for item in value.split(',') if item.strip())
+        ingredients = list(dict.fromkeys(ingredients))
         
-        else:
+        if not (query or ingredients or category or area):
             return jsonify({'error': 'At least one search parameter is required'}), 400
         
-        # Remove duplicates based on recipe ID
-        unique_results = []
-        seen_ids = set()
-        for recipe in results:
-            recipe_id = recipe.get('idMeal')
-            if recipe_id not in seen_ids:
-                unique_results.append(recipe)
-                seen_ids.add(recipe_id)
+        service = RecipeService()
+        result = service.advanced_search(
+            query=query,
+            ingredients=ingredients,
+            category=category,
+            area=area,
+            match_all=match_all
+        )
+        
+        if not result['success']:
+            return jsonify({'error': result['error']}), 500
         
         return jsonify({
-            'message': f'Found {len(unique_results)} recipes',
-            'data': unique_results,
-            'count': len(unique_results)
+            'message': f'Found {result["count"]} recipes',
+            'data': list_data(result['data']),
+            'count': result['count'],
+            'criteria_count': result['criteria_count']
         }), 200
         
     except Exception as e:
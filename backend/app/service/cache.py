@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """Single cached value with its freshness deadlines"""
+
+    __slots__ = ('value', 'size', 'expires_at', 'stale_until')
+
+    def __init__(self, value, size, expires_at, stale_until):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """Bounded in-process TTL + LRU cache for TheMealDB responses
+
+    Entries are evicted least-recently-used first whenever the entry count or
+    the approximate byte size goes over budget. Expired entries are still
+    served for a grace period while a background thread refreshes them
+    (stale-while-revalidate). Cached values are shared, treat them as read-only.
+    """
+
+    def __init__(self, max_entries=2048, max_bytes=32 * 1024 * 1024, stale_seconds=3600, ttls=None, default_ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def init_app(self, app):
+        """Configure limits and per-endpoint TTLs from app config"""
+        config = app.config
+        with self._lock:
+            self.max_entries = config['THEMEALDB_CACHE_MAX_ENTRIES']
+            self.max_bytes = config['THEMEALDB_CACHE_MAX_BYTES']
+            self.stale_seconds = config['THEMEALDB_CACHE_STALE_SECONDS']
+            self.ttls = dict(config['THEMEALDB_CACHE_TTLS'])
+            self.default_ttl = config['THEMEALDB_CACHE_DEFAULT_TTL']
+            self._evict()
+
+    @staticmethod
+    def make_key(endpoint, params=None):
+        """Build a cache key from endpoint plus sorted query params"""
+        if not params:
+            return endpoint
+        query = '&'.join(f'{k}={str(v).strip().lower()}' for k, v in sorted(params.items()))
+        return f'{endpoint}?{query}'
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key):
+        """Return (value, is_fresh) or (None, None) if the key is missing/expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.stale_until:
+                if entry is not None:
+                    self._remove(key)
+                self._counters['misses'] += 1
+                return None, None
+
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self._counters['hits'] += 1
+                return entry.value, True
+
+            self._counters['stale_hits'] += 1
+            return entry.value, False
+
+    def peek(self, key):
+        """Return a cached value (fresh or stale) without loading, counting or touching LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry.stale_until:
+                return None
+            return entry.value
+
+    def contains(self, key):
+        """True if key has a fresh entry (does not touch counters or LRU order)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() < entry.expires_at
+
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds (ttl <= 0 disables caching)"""
+        if ttl <= 0:
+            return
+
+        size = len(json.dumps(value, separators=(',', ':')))
+        if size > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(value, size, now + ttl, now + ttl + self.stale_seconds)
+            self._bytes += size
+            self._evict()
+
+    def get_or_load(self, endpoint, params, loader):
+        """Return a cached response for endpoint/params, calling loader() on a miss
+
+        Stale entries are returned immediately and refreshed in the background.
+        Exceptions from loader() propagate and are never cached.
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return loader()
+
+        key = self.make_key(endpoint, params)
+        value, is_fresh = self.get(key)
+
+        if is_fresh is None:
+            value = loader()
+            self.set(key, value, ttl)
+        elif not is_fresh:
+            self._refresh_in_background(key, ttl, loader)
+
+        return value
+
+    def _refresh_in_background(self, key, ttl, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, loader(), ttl)
+                with self._lock:
+                    self._counters['refreshes'] += 1
+            except Exception:
+                # Keep serving the stale value until it falls out of the grace period
+                with self._lock:
+                    self._counters['refresh_errors'] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current size"""
+        with self._lock:
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes
+            )
+
+
+# Shared cache instance (initialized in create_app)
+response_cache = ResponseCache()
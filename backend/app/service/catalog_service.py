@@ -0,0 +1,223 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from sqlalchemy import func
+from app import db
+from app.models import (
+    CatalogRecipe, CatalogCategory, CatalogArea, CatalogIngredient,
+    CatalogTag, CatalogRecipeIngredient
+)
+from app.service.http_client import upstream_client
+from app.utils.helpers import normalize_name, clean_field
+
+
+class LocalCatalogClient:
+    """Answers TheMealDB endpoints from the local catalog tables
+
+    Drop-in replacement for UpstreamClient: get_json() returns the same JSON
+    shapes as the real API, so RecipeService does not care where data comes from.
+    """
+
+    def get_json(self, endpoint, params=None, timeout=None):
+        params = params or {}
+        handlers = {
+            'search.php': self._search,
+            'lookup.php': self._lookup,
+            'filter.php': self._filter,
+            'categories.php': self._categories,
+            'list.php': self._list,
+            'random.php': self._random
+        }
+        handler = handlers.get(endpoint)
+        if handler is None:
+            raise requests.exceptions.InvalidURL(f'Endpoint {endpoint} is not available in local catalog')
+        return handler(params)
+
+    def _search(self, params):
+        query = params.get('s', '').strip()
+        recipes = CatalogRecipe.query.filter(
+            CatalogRecipe.name.ilike(f'%{query}%')
+        ).order_by(CatalogRecipe.name).all()
+        return {'meals': [recipe.to_api_dict() for recipe in recipes] or None}
+
+    def _lookup(self, params):
+        recipe = db.session.get(CatalogRecipe, str(params.get('i', '')))
+        return {'meals': [recipe.to_api_dict()] if recipe else None}
+
+    def _filter(self, params):
+        query = CatalogRecipe.query
+        if 'c' in params:
+            query = query.join(CatalogCategory).filter(func.lower(CatalogCategory.name) == normalize_name(params['c']))
+        elif 'a' in params:
+            query = query.join(CatalogArea).filter(func.lower(CatalogArea.name) == normalize_name(params['a']))
+        elif 'i' in params:
+            query = query.join(CatalogRecipeIngredient).join(CatalogIngredient).filter(
+                CatalogIngredient.normalized_name == normalize_name(params['i'])
+            )
+        else:
+            return {'meals': None}
+
+        recipes = query.order_by(CatalogRecipe.name).all()
+        return {'meals': [recipe.to_summary_dict() for recipe in recipes] or None}
+
+    def _categories(self, params):
+        categories = CatalogCategory.query.order_by(CatalogCategory.id).all()
+        return {'categories': [category.to_api_dict() for category in categories]}
+
+    def _list(self, params):
+        if 'a' in params:
+            areas = CatalogArea.query.order_by(CatalogArea.name).all()
+            return {'meals': [{'strArea': area.name} for area in areas]}
+        if 'c' in params:
+            categories = CatalogCategory.query.order_by(CatalogCategory.name).all()
+            return {'meals': [{'strCategory': category.name} for category in categories]}
+        if 'i' in params:
+            ingredients = CatalogIngredient.query.order_by(CatalogIngredient.name).all()
+            return {'meals': [
+                {'idIngredient': str(ingredient.id), 'strIngredient': ingredient.name}
+                for ingredient in ingredients
+            ]}
+        return {'meals': None}
+
+    def _random(self, params):
+        recipe = CatalogRecipe.query.order_by(func.random()).first()
+        return {'meals': [recipe.to_api_dict()] if recipe else None}
+
+
+class CatalogSync:
+    """Mirror TheMealDB into the local catalog tables
+
+    Walks categories.php -> filter.php?c= -> lookup.php?i=, fetching recipe
+    details concurrently and writing them in batches.
+    """
+
+    def __init__(self, client=None, workers=8, batch_size=100):
+        self.client = client or upstream_client
+        self.workers = workers
+        self.batch_size = batch_size
+        self._ingredients = {}
+        self._tags = {}
+        self._categories = {}
+        self._areas = {}
+
+    def run(self, log=print):
+        """Run a full sync and return counters"""
+        stats = {'categories': 0, 'areas': 0, 'recipes': 0, 'failed': 0}
+
+        categories = self.client.get_json('categories.php').get('categories') or []
+        for raw in categories:
+            self._upsert_category(raw)
+        stats['categories'] = len(categories)
+
+        areas = self.client.get_json('list.php', params={'a': 'list'}).get('meals') or []
+        for raw in areas:
+            self._get_area(raw.get('strArea'))
+        stats['areas'] = len(areas)
+        db.session.commit()
+        log(f"Synced {stats['categories']} categories and {stats['areas']} areas")
+
+        recipe_ids = []
+        for raw in categories:
+            meals = self.client.get_json('filter.php', params={'c': raw['strCategory']}).get('meals') or []
+            recipe_ids.extend(meal['idMeal'] for meal in meals)
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        log(f"Found {len(recipe_ids)} recipes, fetching details...")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for index, meal in enumerate(executor.map(self._lookup, recipe_ids), start=1):
+                if meal is None:
+                    stats['failed'] += 1
+                    continue
+
+                self.upsert_recipe(meal)
+                stats['recipes'] += 1
+                if index % self.batch_size == 0:
+                    db.session.commit()
+                    log(f"  {index}/{len(recipe_ids)}")
+
+        db.session.commit()
+        return stats
+
+    def _lookup(self, recipe_id):
+        """Fetch one recipe (runs in worker threads, no DB access here)"""
+        try:
+            meals = self.client.get_json('lookup.php', params={'i': recipe_id}).get('meals')
+            return meals[0] if meals else None
+        except requests.exceptions.RequestException:
+            return None
+
+    def upsert_recipe(self, raw):
+        """Insert or update a recipe from a raw TheMealDB meal object"""
+        recipe = db.session.get(CatalogRecipe, raw['idMeal'])
+        if recipe is None:
+            recipe = CatalogRecipe(id=raw['idMeal'])
+            db.session.add(recipe)
+
+        recipe.name = clean_field(raw.get('strMeal'))
+        recipe.category = self._get_category(clean_field(raw.get('strCategory')))
+        recipe.area = self._get_area(clean_field(raw.get('strArea')))
+        recipe.instructions = raw.get('strInstructions')
+        recipe.image = raw.get('strMealThumb')
+        recipe.youtube = raw.get('strYoutube')
+        recipe.source = raw.get('strSource')
+        # Set explicitly: onupdate misses syncs that only change ingredients or tags,
+        # and processed recipes are cached per synced_at
+        recipe.synced_at = datetime.utcnow()
+
+        tag_names = [clean_field(tag) for tag in (raw.get('strTags') or '').split(',')]
+        recipe.tags = [self._get_tag(name) for name in dict.fromkeys(tag_names) if name]
+
+        lines = []
+        seen = set()
+        for i in range(1, 21):
+            name = clean_field(raw.get(f'strIngredient{i}'))
+            if not name:
+                continue
+            ingredient = self._get_ingredient(name)
+            if ingredient.normalized_name in seen:
+                continue
+            seen.add(ingredient.normalized_name)
+            lines.append(CatalogRecipeIngredient(
+                position=i,
+                ingredient=ingredient,
+                measure=clean_field(raw.get(f'strMeasure{i}'))
+            ))
+        recipe.ingredients = lines
+        return recipe
+
+    def _upsert_category(self, raw):
+        category = self._get_category(raw['strCategory'])
+        category.thumb = raw.get('strCategoryThumb')
+        category.description = raw.get('strCategoryDescription')
+        return category
+
+    def _get_category(self, name):
+        return self._get_or_create(self._categories, CatalogCategory, name)
+
+    def _get_area(self, name):
+        return self._get_or_create(self._areas, CatalogArea, name)
+
+    def _get_tag(self, name):
+        return self._get_or_create(self._tags, CatalogTag, name)
+
+    def _get_or_create(self, memo, model, name):
+        if not name:
+            return None
+        if name not in memo:
+            memo[name] = model.query.filter_by(name=name).first() or model(name=name)
+            db.session.add(memo[name])
+        return memo[name]
+
+    def _get_ingredient(self, name):
+        key = normalize_name(name)
+        if key not in self._ingredients:
+            ingredient = CatalogIngredient.query.filter_by(normalized_name=key).first()
+            if ingredient is None:
+                ingredient = CatalogIngredient(name=name, normalized_name=key)
+                db.session.add(ingredient)
+            self._ingredients[key] = ingredient
+        return self._ingredients[key]
+
+
+# Shared instance used by RecipeService when RECIPE_BACKEND = 'local'
+local_catalog = LocalCatalogClient()
@@ -0,0 +1,101 @@
+import queue
+import threading
+from app import db
+from app.models import Favorite
+
+
+class FavoriteBackfillWorker:
+    """Background worker that fills in recipe name/image of pending favorites
+
+    Favorites are saved right away even when the recipe is not known locally;
+    such rows have recipe_name == Favorite.PENDING_NAME until this worker
+    looks the recipe up.
+    Rows whose recipe does not exist are removed. Lookups that fail because
+    the upstream API is down are retried on the next sweep.
+    """
+
+    def __init__(self, sweep_interval=60):
+        self.sweep_interval = sweep_interval
+        self.app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.sweep_interval = app.config['FAVORITE_BACKFILL_SWEEP_SECONDS']
+
+    def enqueue(self, recipe_id):
+        """Schedule a metadata lookup for recipe_id"""
+        self._queue.put(str(recipe_id))
+        self._ensure_started()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='favorite-backfill', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                recipe_ids = [self._queue.get(timeout=self.sweep_interval)]
+            except queue.Empty:
+                recipe_ids = None
+
+            with self.app.app_context():
+                try:
+                    if recipe_ids is None:
+                        recipe_ids = self.pending_recipe_ids()
+
+                    if not recipe_ids:
+                        # Nothing left to do, the next enqueue starts a new worker
+                        with self._lock:
+                            if self._queue.empty():
+                                self._thread = None
+                                return
+                        continue
+
+                    for recipe_id in dict.fromkeys(recipe_ids):
+                        self.backfill(recipe_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Favorite backfill error: {e}")
+                finally:
+                    db.session.remove()
+
+    def pending_recipe_ids(self):
+        rows = db.session.query(Favorite.recipe_id).filter(Favorite.recipe_name == Favorite.PENDING_NAME).distinct().all()
+        return [row.recipe_id for row in rows]
+
+    def backfill(self, recipe_id):
+        """Resolve one recipe and update (or remove) all pending favorites for it"""
+        from app.service.recipe_service import RecipeService
+        from app.service.favorite_service import update_daily_counts
+        from app.service.popularity import track_favorite_change, popularity_tracker
+
+        pending = Favorite.query.filter_by(recipe_id=recipe_id, recipe_name=Favorite.PENDING_NAME).all()
+        if not pending:
+            return
+
+        result = RecipeService().get_recipe_by_id(recipe_id)
+        if result['success']:
+            for favorite in pending:
+                favorite.recipe_name = result['data']['name'] or recipe_id
+                favorite.recipe_image = result['data']['image']
+        elif result['error'] == 'Recipe not found':
+            for favorite in pending:
+                db.session.delete(favorite)
+                update_daily_counts(favorite.user_id, {favorite.created_at.date(): -1})
+                track_favorite_change(recipe_id, -1)
+        else:
+            return  # Upstream problem, keep the rows pending for the next sweep
+
+        db.session.commit()
+        if result['success']:
+            # Counted recipes get their category/area without another lookup
+            popularity_tracker.note_details(recipe_id, result['data'])
+
+
+# Shared worker instance (initialized in create_app)
+favorite_backfill = FavoriteBackfillWorker()
@@ -0,0 +1,409 @@
+import base64
+import json
+from datetime import datetime
+from collections import Counter
+from sqlalchemy import case, delete, select, update, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Favorite, FavoriteDailyCount, IdempotencyKey
+from app.service.recipe_service import RecipeService
+from app.service.popularity import track_favorite_change
+
+
+def _insert_ignoring_duplicates(model, index_elements):
+    """INSERT ... ON CONFLICT DO NOTHING for the current database dialect (None if unsupported)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def increment_counter(table, keys, column, delta, minimum=None):
+    """Add delta to table.column for the row matching keys, creating the row if needed
+
+    With minimum the value never drops below it. Does not commit.
+    """
+    def bounded(value):
+        if minimum is None:
+            return value
+        return case((value < minimum, minimum), else_=value)
+
+    initial = delta if minimum is None else max(delta, minimum)
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(**keys, **{column: initial})
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: bounded(table.c[column] + delta)}
+        ))
+        return
+
+    # Generic fallback: update, insert if there was no row yet
+    result = db.session.execute(
+        update(table)
+        .where(*(table.c[name] == value for name, value in keys.items()))
+        .values(**{column: bounded(table.c[column] + delta)})
+    )
+    if result.rowcount == 0:
+        db.session.execute(table.insert().values(**keys, **{column: initial}))
+
+
+def _daily_counts_seeded(user_id):
+    """True once a user's favorites have been counted into the rollup"""
+    return db.session.scalar(
+        select(FavoriteDailyCount.user_id).where(FavoriteDailyCount.user_id == int(user_id)).limit(1)
+    ) is not None
+
+
+def _count_favorites_by_day(user_id=None):
+    """select (user_id, day, count) straight from the favorites table"""
+    day = func.date(Favorite.created_at, type_=db.Date)
+    query = select(Favorite.user_id, day.label('day'), func.count(Favorite.id).label('count'))
+    if user_id is not None:
+        query = query.where(Favorite.user_id == int(user_id))
+    return query.group_by(Favorite.user_id, day)
+
+
+def update_daily_counts(user_id, deltas):
+    """Apply {date: delta} to a user's favorites rollup in the current transaction. Does not commit.
+
+    A user without rollup rows yet (favorites from before the rollup existed,
+    or a cleared table) is counted from the favorites table instead, which
+    already includes this change.
+    """
+    if not _daily_counts_seeded(user_id):
+        rebuild_daily_counts(user_id)
+        return
+
+    for day, delta in deltas.items():
+        if delta:
+            increment_counter(
+                FavoriteDailyCount.__table__, {'user_id': int(user_id), 'day': day}, 'count', delta, minimum=0
+            )
+
+
+def rebuild_daily_counts(user_id=None):
+    """Recompute the favorites rollup (of one user, or everyone) from the favorites table. Does not commit."""
+    table = FavoriteDailyCount.__table__
+    stmt = delete(table)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == int(user_id))
+    db.session.execute(stmt)
+    result = db.session.execute(table.insert().from_select(['user_id', 'day', 'count'], _count_favorites_by_day(user_id)))
+    return result.rowcount
+
+
+def favorites_stats(user_id, days=7):
+    """Total favorites plus the most recent days with activity
+
+    Read from the rollup, or counted live for users the rollup has not seen yet.
+    """
+    if not _daily_counts_seeded(user_id):
+        counts = _count_favorites_by_day(user_id).subquery()
+        rows = db.session.execute(select(counts.c.day, counts.c['count']).order_by(counts.c.day.desc())).all()
+        recent = [FavoriteDailyCount(user_id=int(user_id), day=day, count=count) for day, count in rows[:days]]
+        return sum(count for _, count in rows), recent
+
+    total = db.session.scalar(
+        select(func.coalesce(func.sum(FavoriteDailyCount.count), 0))
+        .where(FavoriteDailyCount.user_id == int(user_id))
+    )
+    recent = db.session.scalars(
+        select(FavoriteDailyCount)
+        .where(FavoriteDailyCount.user_id == int(user_id), FavoriteDailyCount.count > 0)
+        .order_by(FavoriteDailyCount.day.desc())
+        .limit(days)
+    ).all()
+    return total, recent
+
+
+def build_favorite_values(user_id, recipe_id):
+    """Column values for a new favorite, using only locally known recipe details
+
+    Returns None if the recipe is known not to exist. Unknown recipes get a
+    pending favorite that the backfill worker completes later.
+    """
+    service = RecipeService()
+    recipe_result = service.peek_recipe(recipe_id)
+    
+    if recipe_result is None:
+        return {
+            'user_id': int(user_id),
+            'recipe_id': str(recipe_id),
+            'recipe_name': Favorite.PENDING_NAME,
+            'recipe_image': None
+        }
+    
+    if not recipe_result['success']:
+        return None
+    
+    recipe_data = recipe_result['data']
+    return {
+        'user_id': int(user_id),
+        'recipe_id': str(recipe_id),
+        'recipe_name': recipe_data['name'],
+        'recipe_image': recipe_data['image']
+    }
+
+
+def add_favorite(values):
+    """Insert a favorite in a single statement
+
+    Returns the new Favorite, or None if the user already has this recipe.
+    Does not commit.
+    """
+    stmt = _insert_ignoring_duplicates(Favorite, ['user_id', 'recipe_id'])
+    if stmt is None:
+        # Generic fallback: plain insert inside a savepoint
+        try:
+            with db.session.begin_nested():
+                favorite = Favorite(**values)
+                db.session.add(favorite)
+        except IntegrityError:
+            return None
+    else:
+        favorite = db.session.scalars(stmt.values(**values).returning(Favorite)).first()
+        if favorite is None:
+            return None
+
+    update_daily_counts(favorite.user_id, {favorite.created_at.date(): 1})
+    track_favorite_change(favorite.recipe_id, 1)
+    return favorite
+
+
+def remove_favorite(user_id, recipe_id):
+    """Delete a favorite in a single statement, returns True if a row was removed. Does not commit."""
+    condition = and_(Favorite.user_id == int(user_id), Favorite.recipe_id == str(recipe_id))
+    if db.engine.dialect.delete_returning:
+        created_at = db.session.execute(
+            delete(Favorite)
+            .where(condition)
+            .returning(Favorite.created_at)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    else:
+        created_at = db.session.scalar(select(Favorite.created_at).where(condition))
+        if created_at is not None:
+            db.session.execute(delete(Favorite).where(condition).execution_options(synchronize_session=False))
+
+    if created_at is None:
+        return False
+
+    update_daily_counts(user_id, {created_at.date(): -1})
+    track_favorite_change(recipe_id, -1)
+    return True
+
+
+def find_idempotent_response(user_id, key, endpoint):
+    """Stored (payload, status) for an Idempotency-Key, or None if the key is new
+
+    Raises ValueError if the key was already used for a different endpoint.
+    """
+    record = IdempotencyKey.query.filter_by(user_id=int(user_id), key=key).first()
+    if record is None:
+        return None
+    if record.endpoint != endpoint:
+        raise ValueError('Idempotency-Key was already used for a different request')
+    return json.loads(record.response_body), record.status_code
+
+
+class IdempotencyKeyInUse(Exception):
+    """Another request with the same Idempotency-Key stored its response first"""
+
+
+def remember_response(user_id, key, endpoint, payload, status_code):
+    """Store a response for an Idempotency-Key in the current transaction. Does not commit.
+
+    Raises IdempotencyKeyInUse if a concurrent request already stored one for
+    this key; only the key row is inside the savepoint, so other constraint
+    failures are not mistaken for it.
+    """
+    db.session.flush()
+    try:
+        with db.session.begin_nested():
+            db.session.add(IdempotencyKey(
+                user_id=int(user_id),
+                key=key,
+                endpoint=endpoint,
+                status_code=status_code,
+                response_body=json.dumps(payload)
+            ))
+    except IntegrityError:
+        raise IdempotencyKeyInUse(key)
+
+
+def encode_cursor(favorite):
+    """Opaque pagination cursor pointing at a favorite's (created_at, id)"""
+    raw = f'{favorite.created_at.isoformat()}|{favorite.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor, raises ValueError for malformed cursors"""
+    try:
+        created_at, favorite_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(favorite_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def favorites_query(user_id, cursor=None):
+    """User's favorites, newest first, optionally starting after a cursor
+
+    Ordered by (created_at, id) so it is served by ix_favorites_user_created.
+    """
+    query = Favorite.query.filter(Favorite.user_id == int(user_id))
+    if cursor:
+        created_at, favorite_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Favorite.created_at < created_at,
+            and_(Favorite.created_at == created_at, Favorite.id < favorite_id)
+        ))
+    return query.order_by(Favorite.created_at.desc(), Favorite.id.desc())
+
+
+def favorites_page(user_id, limit, cursor=None):
+    """One page of favorites plus the cursor of the next page (None on the last page)"""
+    favorites = favorites_query(user_id, cursor).limit(limit + 1).all()
+    next_cursor = encode_cursor(favorites[limit - 1]) if len(favorites) > limit else None
+    return favorites[:limit], next_cursor
+
+
+def iter_favorites(user_id, batch_size=500):
+    """Yield all favorites of a user from a server-side cursor, batch_size rows at a time"""
+    yield from favorites_query(user_id).yield_per(batch_size)
+
+
+def _parse_import_line(line):
+    """Favorite values from one NDJSON line: {"recipe_id": ...} (e.g. an export line) or a bare ID"""
+    line = line.decode('utf-8') if isinstance(line, bytes) else line
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith('{'):
+        item = json.loads(line)
+    else:
+        item = {'recipe_id': json.loads(line) if line.startswith('"') else line}
+
+    # Check types up front so any malformed line is rejected like invalid JSON
+    recipe_id = item.get('recipe_id')
+    if isinstance(recipe_id, int) and not isinstance(recipe_id, bool):
+        recipe_id = str(recipe_id)
+    if not isinstance(recipe_id, str):
+        raise ValueError('Invalid recipe_id')
+    recipe_id = recipe_id.strip()
+    if not recipe_id or len(recipe_id) > 50 or len(recipe_id.split()) > 1:
+        raise ValueError('Invalid recipe_id')
+
+    values = {'recipe_id': recipe_id}
+    recipe_name = item.get('recipe_name')
+    recipe_image = item.get('recipe_image')
+    created_at = item.get('created_at')
+    if recipe_name is not None and not isinstance(recipe_name, str):
+        raise ValueError('Invalid recipe_name')
+    if recipe_image is not None and (not isinstance(recipe_image, str) or len(recipe_image) > 500):
+        raise ValueError('Invalid recipe_image')
+    if created_at is not None and not isinstance(created_at, str):
+        raise ValueError('Invalid created_at')
+
+    if recipe_name:
+        values['recipe_name'] = recipe_name[:200]
+        values['recipe_image'] = recipe_image
+    if created_at:
+        values['created_at'] = datetime.fromisoformat(created_at)
+    return values
+
+
+def import_favorites(user_id, lines, batch_size=500):
+    """Insert favorites from NDJSON lines in batches, skipping ones the user already has
+
+    Recipe details are taken from the line itself, then the local catalog or
+    response cache; anything still unknown is saved as pending for the backfill
+    worker. Commits after every batch. Returns counters plus the pending recipe IDs.
+    """
+    stats = {'received': 0, 'imported': 0, 'skipped': 0, 'invalid': 0}
+    pending_ids = []
+    batch = []
+
+    def flush():
+        rows = _resolve_import_batch(user_id, batch, stats)
+        if rows:
+            inserted = _insert_many(user_id, rows)
+            stats['imported'] += inserted
+            stats['skipped'] += len(rows) - inserted
+            pending_ids.extend(row['recipe_id'] for row in rows if row['recipe_name'] == Favorite.PENDING_NAME)
+        db.session.commit()
+        batch.clear()
+
+    for line in lines:
+        try:
+            values = _parse_import_line(line)
+        except (ValueError, TypeError):
+            stats['invalid'] += 1
+            continue
+        if values is None:
+            continue
+
+        stats['received'] += 1
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return stats, pending_ids
+
+
+def _resolve_import_batch(user_id, batch, stats):
+    """Fill in recipe name/image for a batch from local data, dropping unknown-invalid IDs"""
+    service = RecipeService()
+    summaries = service.peek_recipe_summaries(
+        values['recipe_id'] for values in batch if 'recipe_name' not in values
+    )
+
+    rows = []
+    for values in batch:
+        row = {
+            'user_id': int(user_id),
+            'recipe_id': values['recipe_id'],
+            'recipe_name': values.get('recipe_name'),
+            'recipe_image': values.get('recipe_image'),
+            'created_at': values.get('created_at') or datetime.utcnow()
+        }
+        if row['recipe_name'] is None:
+            if values['recipe_id'] in summaries:
+                summary = summaries[values['recipe_id']]
+                if summary is None:
+                    stats['invalid'] += 1
+                    continue
+                row['recipe_name'] = summary['name'] or values['recipe_id']
+                row['recipe_image'] = summary['image']
+            else:
+                row['recipe_name'] = Favorite.PENDING_NAME
+        rows.append(row)
+    return rows
+
+
+def _insert_many(user_id, rows):
+    """Batched INSERT ... ON CONFLICT DO NOTHING, returns how many rows were inserted"""
+    # Core table (not the mapped class) so this runs as a plain executemany
+    table = Favorite.__table__
+    stmt = _insert_ignoring_duplicates(table, ['user_id', 'recipe_id'])
+    if stmt is None:
+        return sum(1 for row in rows if add_favorite(row) is not None)
+
+    created = db.session.execute(stmt.returning(table.c.recipe_id, table.c.created_at), rows).all()
+    update_daily_counts(user_id, Counter(row.created_at.date() for row in created))
+    for row in created:
+        track_favorite_change(row.recipe_id, 1)
+    return len(created)
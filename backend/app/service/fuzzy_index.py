@@ -0,0 +1,153 @@
+from array import array
+from app.service.recipe_index import RecipeIndex
+from app.utils.helpers import normalize_name
+
+RECIPE = 'recipe'
+WORD = 'word'
+INGREDIENT = 'ingredient'
+
+# Ranking weight per term kind: whole recipe names beat single words of a name,
+# which beat recipes reached through an ingredient
+KIND_WEIGHTS = {RECIPE: 1.0, WORD: 0.95, INGREDIENT: 0.9}
+MIN_WORD_LENGTH = 4
+
+
+def trigrams(text):
+    """Set of character trigrams of a normalized, padded string"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex(RecipeIndex):
+    """Trigram index over recipe and ingredient names for typo-tolerant lookups
+
+    Each distinct name is a term; trigram postings point at term numbers.
+    Similarity is the Jaccard coefficient of trigram sets. The number of terms
+    is capped by max_terms to keep memory bounded.
+    """
+
+    def __init__(self, max_terms=50000):
+        super().__init__()
+        self.max_terms = max_terms
+        self._postings = {}     # trigram -> array('I') of term numbers
+        self._terms = []        # term number -> [name, kind, trigram count, recipe ids] or None
+        self._term_ids = {}     # (kind, normalized name) -> term number
+        self._free = []
+        self._summaries = {}    # recipe id -> summary dict
+
+    def _add_term(self, name, kind, recipe_id):
+        key = (kind, normalize_name(name))
+        if not key[1]:
+            return None
+
+        term = self._term_ids.get(key)
+        if term is None:
+            if len(self._term_ids) >= self.max_terms:
+                return None
+            grams = trigrams(key[1])
+            entry = [name, kind, len(grams), set()]
+            if self._free:
+                term = self._free.pop()
+                self._terms[term] = entry
+            else:
+                term = len(self._terms)
+                self._terms.append(entry)
+            self._term_ids[key] = term
+            for gram in grams:
+                self._postings.setdefault(gram, array('I')).append(term)
+
+        self._terms[term][3].add(recipe_id)
+        return term
+
+    def _drop_term(self, term):
+        name, kind, _, _ = self._terms[term]
+        key = (kind, normalize_name(name))
+        for gram in trigrams(key[1]):
+            postings = self._postings[gram]
+            postings.remove(term)
+            if not postings:
+                del self._postings[gram]
+        del self._term_ids[key]
+        self._terms[term] = None
+        self._free.append(term)
+
+    def _add(self, recipe):
+        recipe_id = recipe['id']
+        terms = [self._add_term(recipe.get('name'), RECIPE, recipe_id)]
+        for word in normalize_name(recipe.get('name')).split():
+            if len(word) >= MIN_WORD_LENGTH:
+                terms.append(self._add_term(word, WORD, recipe_id))
+        for item in recipe.get('ingredients', []):
+            terms.append(self._add_term(item['ingredient'], INGREDIENT, recipe_id))
+
+        self._doc_ids[recipe_id] = tuple(term for term in set(terms) if term is not None)
+        self._summaries[recipe_id] = {
+            'idMeal': recipe_id,
+            'strMeal': recipe.get('name'),
+            'strMealThumb': recipe.get('image'),
+            'strCategory': recipe.get('category'),
+            'strArea': recipe.get('area')
+        }
+
+    def _remove(self, recipe_id):
+        terms = self._doc_ids.pop(recipe_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            self._terms[term][3].discard(recipe_id)
+            if not self._terms[term][3]:
+                self._drop_term(term)
+        del self._summaries[recipe_id]
+
+    def lookup(self, text, kinds=(RECIPE, WORD, INGREDIENT), threshold=0.3, limit=10):
+        """Names most similar to text, as (similarity, name, kind, recipe ids)"""
+        normalized = normalize_name(text)
+        if not normalized:
+            return []
+
+        grams = trigrams(normalized)
+        with self._lock:
+            shared = {}
+            for gram in grams:
+                for term in self._postings.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+
+            matches = []
+            for term, count in shared.items():
+                name, kind, size, recipe_ids = self._terms[term]
+                if kind not in kinds:
+                    continue
+                similarity = count / (len(grams) + size - count)
+                if similarity >= threshold:
+                    matches.append((similarity, name, kind, tuple(recipe_ids)))
+
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches[:limit]
+
+    def search(self, text, threshold=0.3, limit=20):
+        """Best-effort recipes for a query that had no exact match
+
+        Recipes rank by the similarity of their best matching name, weighted
+        by KIND_WEIGHTS.
+        """
+        best = {}
+        for similarity, name, kind, recipe_ids in self.lookup(text, threshold=threshold, limit=limit):
+            score = similarity * KIND_WEIGHTS[kind]
+            for recipe_id in recipe_ids:
+                if score > best.get(recipe_id, (0,))[0]:
+                    best[recipe_id] = (score, name)
+
+        with self._lock:
+            ranked = sorted(
+                (item for item in best.items() if item[0] in self._summaries),
+                key=lambda item: (-item[1][0], self._summaries[item[0]]['strMeal'] or '')
+            )
+            return [
+                dict(self._summaries[recipe_id], similarity=round(score, 3), matched=name)
+                for recipe_id, (score, name) in ranked[:limit]
+            ]
+
+
+# Shared index instance
+fuzzy_index = FuzzyIndex()
@@ -0,0 +1,136 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when the circuit breaker is refusing calls to the upstream API"""
+
+
+class CircuitBreaker:
+    """Simple closed/open/half-open circuit breaker shared by all workers in a process"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if calls are currently not allowed"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe call through
+                self.state = self.HALF_OPEN
+                return
+
+            raise CircuitOpenError('Upstream API is unavailable (circuit open)')
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def to_dict(self):
+        """Current breaker state, exposed in /api/recipes/cache/stats"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0), 1)
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'failure_threshold': self.failure_threshold,
+                'retry_in_seconds': retry_in
+            }
+
+
+class UpstreamClient:
+    """Process-wide pooled keep-alive HTTP client for TheMealDB API"""
+
+    def __init__(self):
+        self.session = None
+        self.base_url = None
+        self.timeout = (3.05, 10.0)
+        self.breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure session pool, timeouts and circuit breaker from app config"""
+        config = app.config
+
+        with self._lock:
+            self.base_url = config['THEMEALDB_BASE_URL']
+            self.timeout = (
+                config['THEMEALDB_CONNECT_TIMEOUT'],
+                config['THEMEALDB_READ_TIMEOUT']
+            )
+            self.breaker = CircuitBreaker(
+                failure_threshold=config['THEMEALDB_BREAKER_THRESHOLD'],
+                reset_timeout=config['THEMEALDB_BREAKER_RESET_SECONDS']
+            )
+            self.session = self._create_session(config['THEMEALDB_POOL_SIZE'])
+
+    def _create_session(self, pool_size):
+        """Create a session whose connections are kept alive and reused"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session
+
+    def get_json(self, endpoint, params=None, timeout=None):
+        """GET an API endpoint and return the decoded JSON body
+
+        Raises requests.exceptions.RequestException (including CircuitOpenError)
+        on any failure, so callers keep their existing error handling.
+        """
+        if self.session is None:
+            from flask import current_app
+            self.init_app(current_app)
+
+        self.breaker.before_call()
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/{endpoint}",
+                params=params,
+                timeout=timeout or self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.HTTPError as e:
+            # 4xx means the upstream answered, only count server errors
+            if e.response is not None and e.response.status_code < 500:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return data or {}
+
+
+# Shared client instance (initialized in create_app)
+upstream_client = UpstreamClient()
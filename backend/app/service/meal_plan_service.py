@@ -0,0 +1,195 @@
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, delete, select
+from app import db
+from app.models import MealPlan, Favorite, CatalogRecipe, CatalogCategory
+from app.service.recipe_service import RecipeService
+from app.service.shopping_list import aggregate_ingredients
+
+# Catalog categories that suit each meal type best, and ones to avoid for main meals
+MEAL_TYPE_CATEGORIES = {'breakfast': {'breakfast'}}
+NOT_A_MEAL = {'breakfast', 'dessert'}
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD string, raises ValueError if it is not a valid date"""
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f'Invalid date: {value} (expected YYYY-MM-DD)')
+
+
+def meal_plans_between(user_id, start, end):
+    """A user's planned meals from start to end (inclusive), by date then meal type"""
+    meal_order = case(
+        {meal_type: position for position, meal_type in enumerate(MealPlan.MEAL_TYPES)},
+        value=MealPlan.meal_type,
+        else_=len(MealPlan.MEAL_TYPES)
+    )
+    return MealPlan.query.filter(
+        MealPlan.user_id == int(user_id),
+        MealPlan.planned_date >= start,
+        MealPlan.planned_date <= end
+    ).order_by(MealPlan.planned_date, meal_order, MealPlan.id).all()
+
+
+def build_week_rows(user_id, start, meals):
+    """Validate week entries and turn them into meal_plans rows
+
+    Each entry needs planned_date (within the week starting at start),
+    meal_type and recipe_id; recipe_name/recipe_image are looked up when
+    missing. Raises ValueError describing the first invalid entry.
+    """
+    end = start + timedelta(days=6)
+    now = datetime.utcnow()
+    rows = []
+    for position, meal in enumerate(meals):
+        if not isinstance(meal, dict) or not all(k in meal for k in ('planned_date', 'meal_type', 'recipe_id')):
+            raise ValueError(f'Meal {position}: planned_date, meal_type and recipe_id are required')
+
+        planned_date = parse_date(meal['planned_date'])
+        if not start <= planned_date <= end:
+            raise ValueError(f'Meal {position}: {planned_date} is outside the week {start} - {end}')
+
+        meal_type = str(meal['meal_type']).strip().lower()
+        if meal_type not in MealPlan.MEAL_TYPES:
+            raise ValueError(f'Meal {position}: meal_type must be one of {", ".join(MealPlan.MEAL_TYPES)}')
+
+        slot = f'Meal {position} ({planned_date} {meal_type})'
+        recipe_id = meal['recipe_id'].strip() if isinstance(meal['recipe_id'], str) else None
+        if not recipe_id or len(recipe_id) > 50:
+            raise ValueError(f'{slot}: recipe_id must be a non-empty string of at most 50 characters')
+
+        recipe_name = meal.get('recipe_name')
+        recipe_image = meal.get('recipe_image')
+        if recipe_name is not None and not isinstance(recipe_name, str):
+            raise ValueError(f'{slot}: recipe_name must be a string')
+        if recipe_image is not None and (not isinstance(recipe_image, str) or len(recipe_image) > 500):
+            raise ValueError(f'{slot}: recipe_image must be a URL of at most 500 characters')
+
+        rows.append({
+            'user_id': int(user_id),
+            'recipe_id': recipe_id,
+            'recipe_name': recipe_name[:200] if recipe_name else None,
+            'recipe_image': recipe_image,
+            'planned_date': planned_date,
+            'meal_type': meal_type,
+            'created_at': now
+        })
+
+    _fill_recipe_details(rows)
+    return rows
+
+
+def _fill_recipe_details(rows):
+    """Look up name/image for rows without a recipe_name: locally first, then one concurrent batch"""
+    missing = list(dict.fromkeys(row['recipe_id'] for row in rows if not row['recipe_name']))
+    if not missing:
+        return
+
+    service = RecipeService()
+    details = {
+        recipe_id: summary for recipe_id, summary in service.peek_recipe_summaries(missing).items() if summary
+    }
+    to_fetch = [recipe_id for recipe_id in missing if recipe_id not in details]
+    if to_fetch:
+        result = service.get_recipes_by_ids(to_fetch)
+        if result['not_found']:
+            raise ValueError(f'Recipe not found: {", ".join(result["not_found"])}')
+        if result['failed']:
+            raise LookupError('Could not look up recipe details, please try again')
+        details.update({recipe['id']: recipe for recipe in result['data']})
+
+    for row in rows:
+        if not row['recipe_name']:
+            row['recipe_name'] = details[row['recipe_id']]['name'] or row['recipe_id']
+            row['recipe_image'] = details[row['recipe_id']]['image']
+
+
+def replace_week(user_id, start, rows):
+    """Replace everything planned in the week starting at start with rows. Does not commit."""
+    db.session.execute(
+        delete(MealPlan)
+        .where(
+            MealPlan.user_id == int(user_id),
+            MealPlan.planned_date >= start,
+            MealPlan.planned_date <= start + timedelta(days=6)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if rows:
+        db.session.execute(MealPlan.__table__.insert(), rows)
+
+
+def auto_plan_week(user_id, start, meal_types=MealPlan.MEAL_TYPES, seed=None):
+    """Pick a recipe for every day and meal type of a week
+
+    Candidates are the user's favorites (preferred) followed by the local
+    catalog, read in one query each. Recipes are not repeated within the week
+    until every candidate has been used; breakfasts prefer the Breakfast
+    category and other meals avoid breakfast and dessert recipes.
+    Returns meal_plans rows (not saved).
+    """
+    rng = random.Random(seed)
+    favorites = db.session.execute(
+        select(Favorite.recipe_id, Favorite.recipe_name, Favorite.recipe_image, CatalogCategory.name)
+        .outerjoin(CatalogRecipe, CatalogRecipe.id == Favorite.recipe_id)
+        .outerjoin(CatalogCategory, CatalogCategory.id == CatalogRecipe.category_id)
+        .where(Favorite.user_id == int(user_id), Favorite.recipe_name != Favorite.PENDING_NAME)
+    ).all()
+    catalog = db.session.execute(
+        select(CatalogRecipe.id, CatalogRecipe.name, CatalogRecipe.image, CatalogCategory.name)
+        .outerjoin(CatalogCategory, CatalogCategory.id == CatalogRecipe.category_id)
+    ).all()
+    rng.shuffle(favorites)
+    rng.shuffle(catalog)
+
+    candidates = {}
+    for recipe_id, name, image, category in favorites + catalog:
+        candidates.setdefault(recipe_id, (recipe_id, name, image, (category or '').lower()))
+    candidates = list(candidates.values())
+    if not candidates:
+        raise ValueError('Nothing to plan with: add some favorites or sync the recipe catalog first')
+
+    now = datetime.utcnow()
+    used = set()
+    rows = []
+    for day in range(7):
+        for meal_type in meal_types:
+            unused = [candidate for candidate in candidates if candidate[0] not in used]
+            if not unused:
+                used.clear()
+                unused = candidates
+
+            preferred = MEAL_TYPE_CATEGORIES.get(meal_type)
+            if preferred:
+                suitable = [candidate for candidate in unused if candidate[3] in preferred]
+            else:
+                suitable = [candidate for candidate in unused if candidate[3] not in NOT_A_MEAL]
+            recipe_id, name, image, _ = (suitable or unused)[0]
+
+            used.add(recipe_id)
+            rows.append({
+                'user_id': int(user_id),
+                'recipe_id': recipe_id,
+                'recipe_name': name,
+                'recipe_image': image,
+                'planned_date': start + timedelta(days=day),
+                'meal_type': meal_type,
+                'created_at': now
+            })
+    return rows
+
+
+def shopping_list(user_id, start, end):
+    """Consolidated ingredients of every meal planned from start to end
+
+    Recipe details are fetched once per distinct recipe (concurrently, through
+    the cache). Returns (items, IDs of recipes whose details are unavailable).
+    """
+    plans = meal_plans_between(user_id, start, end)
+    result = RecipeService().get_recipes_by_ids(plan.recipe_id for plan in plans)
+    recipes = {recipe['id']: recipe for recipe in result['data']}
+
+    items = aggregate_ingredients(recipes[plan.recipe_id] for plan in plans if plan.recipe_id in recipes)
+    return items, result['not_found'] + result['failed']
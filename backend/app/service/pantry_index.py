@@ -0,0 +1,90 @@
+from array import array
+from bisect import bisect_left, insort
+from app.service.recipe_index import RecipeIndex
+from app.utils.helpers import normalize_name
+
+
+class IngredientIndex(RecipeIndex):
+    """Inverted index from normalized ingredient name to recipes
+
+    Recipes get a dense integer doc number; each ingredient maps to a sorted
+    array of doc numbers, so a pantry query only touches the postings of the
+    ingredients the user has.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}    # ingredient -> array('I') of doc numbers (sorted)
+        self._docs = []        # doc number -> (id, name, image, ingredient names) or None
+        self._free = []        # doc numbers of removed recipes, reused first
+
+    def _add(self, recipe):
+        names = tuple(dict.fromkeys(
+            normalize_name(item['ingredient']) for item in recipe.get('ingredients', [])
+        ))
+        entry = (recipe['id'], recipe.get('name'), recipe.get('image'), names)
+
+        if self._free:
+            doc = self._free.pop()
+            self._docs[doc] = entry
+        else:
+            doc = len(self._docs)
+            self._docs.append(entry)
+        self._doc_ids[recipe['id']] = doc
+
+        for name in names:
+            insort(self._postings.setdefault(name, array('I')), doc)
+
+    def _remove(self, recipe_id):
+        doc = self._doc_ids.pop(recipe_id, None)
+        if doc is None:
+            return
+
+        for name in self._docs[doc][3]:
+            postings = self._postings[name]
+            del postings[bisect_left(postings, doc)]
+            if not postings:
+                del self._postings[name]
+
+        self._docs[doc] = None
+        self._free.append(doc)
+
+    def match(self, have, missing_max=None, limit=20):
+        """Rank recipes by how much of their ingredient list the pantry covers
+
+        Returns a list of dicts with matched/missing ingredient names, best
+        coverage first. Only recipes using at least one pantry item are considered.
+        """
+        pantry = set(normalize_name(item) for item in have if normalize_name(item))
+
+        with self._lock:
+            hits = {}
+            for name in pantry:
+                for doc in self._postings.get(name, ()):
+                    hits[doc] = hits.get(doc, 0) + 1
+
+            ranked = []
+            for doc, matched in hits.items():
+                recipe_id, name, image, ingredients = self._docs[doc]
+                missing = len(ingredients) - matched
+                if missing_max is not None and missing > missing_max:
+                    continue
+                ranked.append((-matched / len(ingredients), missing, -matched, name or '', doc))
+
+            ranked.sort()
+            results = []
+            for _, missing, _, _, doc in ranked[:limit]:
+                recipe_id, name, image, ingredients = self._docs[doc]
+                results.append({
+                    'id': recipe_id,
+                    'name': name,
+                    'image': image,
+                    'coverage': round((len(ingredients) - missing) / len(ingredients), 3),
+                    'matched': [item for item in ingredients if item in pantry],
+                    'missing': [item for item in ingredients if item not in pantry]
+                })
+        return results
+
+
+# Shared index instance
+ingredient_index = IngredientIndex()
@@ -0,0 +1,330 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, event, delete, func, or_, select, update
+from app import db
+from app.models import Favorite, RecipePopularity
+
+# session.info key holding favorite count changes of the current transaction
+SESSION_KEY = 'favorite_popularity_deltas'
+
+
+def track_favorite_change(recipe_id, delta):
+    """Record a favorite count change for recipe_id, applied once the current transaction commits"""
+    db.session.info.setdefault(SESSION_KEY, Counter())[str(recipe_id)] += delta
+
+
+def _after_commit(session):
+    deltas = session.info.pop(SESSION_KEY, None)
+    if deltas:
+        popularity_tracker.record(deltas)
+
+
+def _after_transaction_end(session, transaction):
+    # Rolled back (or closed without commit): forget the changes
+    if transaction.parent is None:
+        session.info.pop(SESSION_KEY, None)
+
+
+class PopularityTracker:
+    """Favorite counts per recipe kept in memory, with cached top-K leaderboards
+
+    Counts are loaded from the recipe_popularity table and adjusted by every
+    committed favorite change in this process. A background thread writes the
+    accumulated changes back every flush_interval seconds and reloads the table,
+    so changes made by other processes show up within one interval. Counts are
+    first loaded by warm() at startup, never by a request. Leaderboards (overall,
+    per category and/or area) are picked with a heap, cached, and kept in order
+    as counts change by moving the changed recipe. Recipe details (name, image, category, area) are written
+    along with the counts when a worker resolves a recipe, and otherwise looked
+    up locally, retrying a recipe at most every details_retry_seconds.
+    """
+
+    details_retry_seconds = 3600
+
+    def __init__(self, flush_interval=30, max_results=100):
+        self.flush_interval = flush_interval
+        self.max_results = max_results
+        self.app = None
+        self._counts = {}          # recipe id -> favorite count
+        self._details = {}         # recipe id -> (name, image, category, area)
+        self._groups = {}          # ('category' | 'area', lowercase name) -> set of recipe ids
+        self._pending = Counter()  # committed changes not yet written to the table
+        self._pending_details = {}  # recipe id -> (name, image, category, area) not yet written
+        self._top = {}             # (category, area) -> cached leaderboard (recipe ids)
+        self._loaded = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config['POPULARITY_FLUSH_SECONDS']
+        self.max_results = app.config['POPULAR_MAX_RESULTS']
+        if not event.contains(db.session, 'after_commit', _after_commit):
+            event.listen(db.session, 'after_commit', _after_commit)
+            event.listen(db.session, 'after_transaction_end', _after_transaction_end)
+
+    def warm(self):
+        """Load counts (seeding the table on first run) so requests are served from memory"""
+        try:
+            self.refresh()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Popularity warm-up error: {e}")
+
+    def record(self, deltas):
+        """Apply committed {recipe_id: delta} changes, moving the changed recipes within cached leaderboards"""
+        with self._lock:
+            for recipe_id, delta in deltas.items():
+                self._pending[recipe_id] += delta
+                self._counts[recipe_id] = self._counts.get(recipe_id, 0) + delta
+                for key in list(self._top):
+                    if self._is_member(recipe_id, *key) and not self._reposition(self._top[key], recipe_id):
+                        del self._top[key]
+        self._ensure_started()
+
+    def note_details(self, recipe_id, recipe):
+        """Remember the details of a resolved (processed) recipe, written with the next flush"""
+        with self._lock:
+            self._pending_details[str(recipe_id)] = (
+                recipe.get('name'), recipe.get('image'), recipe.get('category'), recipe.get('area')
+            )
+
+    def counts(self):
+        """Snapshot of {recipe_id: favorite count} for every favorited recipe"""
+        with self._lock:
+            return {recipe_id: count for recipe_id, count in self._counts.items() if count > 0}
+
+    def top(self, limit=10, category=None, area=None):
+        """Most favorited recipes (optionally within a category and/or area), as summary dicts"""
+        self._ensure_started()
+
+        key = (category.lower() if category else None, area.lower() if area else None)
+        with self._lock:
+            board = self._top.get(key)
+            if board is None:
+                board = self._leaderboard(*key)
+                self._top[key] = board
+
+            results = []
+            for recipe_id in board[:limit]:
+                name, image, category_name, area_name = self._details.get(recipe_id, (None,) * 4)
+                results.append({
+                    'idMeal': recipe_id,
+                    'strMeal': name,
+                    'strMealThumb': image,
+                    'strCategory': category_name,
+                    'strArea': area_name,
+                    'favorite_count': self._counts.get(recipe_id, 0)
+                })
+            return results
+
+    def _leaderboard(self, category, area):
+        candidates = None
+        for group in (('category', category), ('area', area)):
+            if group[1] is None:
+                continue
+            members = self._groups.get(group, set())
+            candidates = members if candidates is None else candidates & members
+        if candidates is None:
+            candidates = self._counts
+
+        best = heapq.nlargest(
+            self.max_results,
+            ((self._counts.get(recipe_id, 0), recipe_id) for recipe_id in candidates)
+        )
+        return [recipe_id for count, recipe_id in best if count > 0]
+
+    def _is_member(self, recipe_id, category, area):
+        return all(
+            recipe_id in self._groups.get(group, ())
+            for group in (('category', category), ('area', area)) if group[1] is not None
+        )
+
+    def _reposition(self, board, recipe_id):
+        """Move recipe_id to its place in a cached leaderboard after its count changed
+
+        Returns False when the board has to be recomputed: the recipe fell off
+        the bottom of a full board, so one left out of it may now outrank it.
+        """
+        full = len(board) >= self.max_results
+        listed = recipe_id in board
+        if listed:
+            board.remove(recipe_id)
+
+        count = self._counts.get(recipe_id, 0)
+        rank = (count, recipe_id)
+        position = next(
+            (i for i, other in enumerate(board) if (self._counts.get(other, 0), other) < rank),
+            len(board)
+        )
+        if count > 0 and (position < len(board) or not full):
+            board.insert(position, recipe_id)
+            del board[self.max_results:]
+            return True
+        return not (full and listed)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='popularity-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        # Load right away if warm() failed at startup
+        wait = self._loaded
+        while True:
+            if wait:
+                time.sleep(self.flush_interval)
+            wait = True
+            with self.app.app_context():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Popularity flush error: {e}")
+                finally:
+                    db.session.remove()
+
+    def refresh(self):
+        """Write pending changes to the table, then reload counts from it"""
+        from app.service.favorite_service import increment_counter
+
+        with self._lock:
+            deltas, self._pending = self._pending, Counter()
+            details, self._pending_details = self._pending_details, {}
+
+        try:
+            if db.session.scalar(select(RecipePopularity.recipe_id).limit(1)) is None:
+                # First run: seed from favorites, which already include the pending changes
+                self.rebuild()
+            else:
+                for recipe_id, delta in deltas.items():
+                    if delta:
+                        increment_counter(RecipePopularity.__table__, {'recipe_id': recipe_id}, 'favorite_count', delta)
+            self._write_details(details)
+            self._fill_details()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._pending.update(deltas)
+                self._pending_details = dict(details, **self._pending_details)
+            raise
+
+        self._reload()
+
+    def rebuild(self):
+        """Recompute all counts from the favorites table. Does not commit."""
+        table = RecipePopularity.__table__
+        db.session.execute(delete(table))
+        db.session.execute(table.insert().from_select(
+            ['recipe_id', 'favorite_count', 'recipe_name', 'recipe_image'],
+            select(
+                Favorite.recipe_id,
+                func.count(Favorite.id),
+                func.nullif(func.max(Favorite.recipe_name), Favorite.PENDING_NAME),
+                func.max(Favorite.recipe_image)
+            ).group_by(Favorite.recipe_id)
+        ))
+
+    def _write_details(self, details):
+        """Store details noted by note_details() on existing rows. Does not commit."""
+        if not details:
+            return
+        table = RecipePopularity.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.recipe_id == bindparam('b_recipe_id'))
+            .values(
+                recipe_name=bindparam('b_name'), recipe_image=bindparam('b_image'),
+                category=bindparam('b_category'), area=bindparam('b_area')
+            ),
+            [
+                {'b_recipe_id': recipe_id, 'b_name': name, 'b_image': image, 'b_category': category, 'b_area': area}
+                for recipe_id, (name, image, category, area) in details.items()
+            ]
+        )
+
+    def _fill_details(self, batch_size=500):
+        """Look up name/image/category/area of counted recipes that do not have them yet
+
+        Recipes that could not be resolved locally are retried at most every
+        details_retry_seconds, never-tried ones first, so they cannot starve
+        newer recipes.
+        """
+        from app.service.recipe_service import RecipeService
+
+        now = datetime.utcnow()
+        rows = RecipePopularity.query.filter(
+            RecipePopularity.category.is_(None),
+            RecipePopularity.favorite_count > 0,
+            or_(
+                RecipePopularity.details_checked_at.is_(None),
+                RecipePopularity.details_checked_at < now - timedelta(seconds=self.details_retry_seconds)
+            )
+        ).order_by(
+            RecipePopularity.details_checked_at.is_not(None),
+            RecipePopularity.details_checked_at,
+            RecipePopularity.favorite_count.desc()
+        ).limit(batch_size).all()
+        if not rows:
+            return
+
+        for row in rows:
+            row.details_checked_at = now
+
+        summaries = RecipeService().peek_recipe_summaries(row.recipe_id for row in rows)
+        for row in rows:
+            summary = summaries.get(row.recipe_id)
+            if summary:
+                row.recipe_name = summary['name']
+                row.recipe_image = summary['image']
+                row.category = summary['category']
+                row.area = summary['area']
+
+        # Fall back to what favorites stored for recipes not known locally
+        missing = [row for row in rows if row.recipe_name is None]
+        if missing:
+            stored = dict(db.session.execute(
+                select(Favorite.recipe_id, func.max(Favorite.recipe_name))
+                .where(Favorite.recipe_id.in_([row.recipe_id for row in missing]))
+                .group_by(Favorite.recipe_id)
+            ).all())
+            for row in missing:
+                row.recipe_name = stored.get(row.recipe_id) or None
+
+    def _reload(self):
+        rows = db.session.execute(
+            select(
+                RecipePopularity.recipe_id, RecipePopularity.favorite_count,
+                RecipePopularity.recipe_name, RecipePopularity.recipe_image,
+                RecipePopularity.category, RecipePopularity.area
+            ).where(RecipePopularity.favorite_count > 0)
+        ).all()
+
+        counts = {}
+        details = {}
+        groups = {}
+        for recipe_id, count, name, image, category, area in rows:
+            counts[recipe_id] = count
+            details[recipe_id] = (name, image, category, area)
+            if category:
+                groups.setdefault(('category', category.lower()), set()).add(recipe_id)
+            if area:
+                groups.setdefault(('area', area.lower()), set()).add(recipe_id)
+
+        with self._lock:
+            for recipe_id, delta in self._pending.items():
+                counts[recipe_id] = counts.get(recipe_id, 0) + delta
+            self._counts = counts
+            self._details = details
+            self._groups = groups
+            self._top.clear()
+            self._loaded = True
+
+
+# Shared tracker instance (initialized in create_app)
+popularity_tracker = PopularityTracker()
@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+from app import db
+
+
+class RandomRecipePool:
+    """Bounded pool of prefetched, processed random recipes
+
+    Requests pop from the pool without touching the network. Whenever it drops
+    to half its size or below, a background thread tops it up with concurrent
+    random.php calls (or local catalog samples). Callers fall back to a
+    direct fetch only when the pool is empty.
+    """
+
+    def __init__(self, size=20):
+        self.size = size
+        self.app = None
+        self._pool = deque()
+        self._wanted = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'fetched': 0, 'fetch_errors': 0}
+
+    def init_app(self, app):
+        self.app = app
+        self.size = app.config['RANDOM_POOL_SIZE']
+
+    def pop(self):
+        """A prefetched recipe, or None if the pool is empty"""
+        if self.size <= 0:
+            return None
+
+        try:
+            recipe = self._pool.popleft()
+            counter = 'hits'
+        except IndexError:
+            recipe = None
+            counter = 'misses'
+
+        with self._lock:
+            self._counters[counter] += 1
+        if len(self._pool) <= self.size // 2:
+            self._request_refill()
+        return recipe
+
+    def _request_refill(self):
+        self._wanted.set()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='random-recipe-pool', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            with self.app.app_context():
+                try:
+                    self.fill()
+                except Exception as e:
+                    print(f"❌ Random recipe pool refill error: {e}")
+                finally:
+                    db.session.remove()
+
+    def fill(self):
+        """Fetch recipes until the pool is full (needs app context)"""
+        from flask import current_app
+        from app.service.recipe_service import RecipeService
+        from app.utils.helpers import run_concurrently
+
+        missing = self.size - len(self._pool)
+        if missing <= 0:
+            return
+
+        service = RecipeService()
+        results = run_concurrently(
+            [service.fetch_random_recipe] * missing,
+            max_workers=current_app.config['FANOUT_MAX_WORKERS']
+        )
+
+        pooled = {recipe['id'] for recipe in list(self._pool)}
+        fetched = 0
+        for result in results:
+            # random.php may repeat itself, keep each recipe once
+            if result['success'] and result['data']['id'] not in pooled and len(self._pool) < self.size:
+                pooled.add(result['data']['id'])
+                self._pool.append(result['data'])
+                fetched += 1
+
+        with self._lock:
+            self._counters['fetched'] += fetched
+            self._counters['fetch_errors'] += sum(1 for result in results if not result['success'])
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, pooled=len(self._pool), size=self.size)
+
+
+# Shared pool instance (initialized in create_app)
+random_pool = RandomRecipePool()
@@ -0,0 +1,166 @@
+import sys
+import threading
+from collections import OrderedDict
+from app.utils.helpers import clean_field
+
+# TheMealDB has up to 20 numbered ingredient/measure fields
+INGREDIENT_FIELDS = tuple((f'strIngredient{i}', f'strMeasure{i}') for i in range(1, 21))
+
+# Every raw meal field Recipe.from_api reads
+API_FIELDS = (
+    'idMeal', 'strMeal', 'strCategory', 'strArea', 'strInstructions', 'strMealThumb', 'strTags', 'strYoutube', 'strSource'
+) + tuple(field for fields in INGREDIENT_FIELDS for field in fields)
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+class _Record:
+    """Immutable __slots__ record that can also be read like the dict it replaces"""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+
+class Ingredient(_Record):
+    """One ingredient line of a recipe (strings are interned)"""
+
+    __slots__ = ('ingredient', 'measure')
+
+    def to_dict(self):
+        return {'ingredient': self.ingredient, 'measure': self.measure}
+
+    def __repr__(self):
+        return f'<Ingredient {self.measure} {self.ingredient}>'
+
+
+class Recipe(_Record):
+    """Processed TheMealDB recipe, built once per recipe and shared read-only"""
+
+    __slots__ = ('id', 'name', 'category', 'area', 'instructions', 'image', 'tags', 'youtube', 'ingredients', 'source')
+
+    @classmethod
+    def from_api(cls, raw):
+        """Build a Recipe from a raw TheMealDB meal dict"""
+        ingredients = []
+        for ingredient_field, measure_field in INGREDIENT_FIELDS:
+            ingredient = clean_field(raw.get(ingredient_field))
+            if ingredient:
+                ingredients.append(Ingredient(_intern(ingredient), _intern(clean_field(raw.get(measure_field)))))
+
+        tags = raw.get('strTags')
+        return cls(
+            raw.get('idMeal'),
+            raw.get('strMeal'),
+            _intern(raw.get('strCategory')),
+            _intern(raw.get('strArea')),
+            raw.get('strInstructions'),
+            raw.get('strMealThumb'),
+            tuple(_intern(tag.strip()) for tag in tags.split(',') if tag.strip()) if tags else (),
+            raw.get('strYoutube'),
+            tuple(ingredients),
+            raw.get('strSource')
+        )
+
+    @classmethod
+    def from_catalog(cls, row):
+        """Build a Recipe straight from a CatalogRecipe row (same result as from_api on its API dict)"""
+        return cls(
+            row.id,
+            row.name,
+            _intern(row.category.name) if row.category else None,
+            _intern(row.area.name) if row.area else None,
+            row.instructions,
+            row.image,
+            tuple(_intern(tag.name) for tag in row.tags),
+            row.youtube,
+            tuple(Ingredient(_intern(item.ingredient.name), _intern(item.measure or '')) for item in row.ingredients),
+            row.source
+        )
+
+    def to_dict(self):
+        """JSON-ready dict in the shape the API has always returned"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'area': self.area,
+            'instructions': self.instructions,
+            'image': self.image,
+            'tags': list(self.tags),
+            'youtube': self.youtube,
+            'ingredients': [item.to_dict() for item in self.ingredients],
+            'source': self.source
+        }
+
+    def __repr__(self):
+        return f'<Recipe {self.id} {self.name}>'
+
+
+class RecipeCache:
+    """Bounded LRU of Recipe objects per recipe ID, each stored with a version
+
+    Catalog recipes are versioned by their synced_at. Raw API meals are
+    versioned by the values of every field the Recipe is built from, so the
+    raw dict itself is never kept alive. Response cache hits hand out the same
+    dict, whose values then compare by identity.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # recipe id -> (version, Recipe)
+        self._lock = threading.Lock()
+
+    def get(self, raw):
+        """Recipe for a raw TheMealDB meal dict, built only if it changed"""
+        version = ('api',) + tuple(raw.get(field) for field in API_FIELDS)
+        return self._get(raw.get('idMeal'), version, lambda: Recipe.from_api(raw))
+
+    def get_catalog(self, row):
+        """Recipe for a CatalogRecipe row, built only if the row was synced since"""
+        return self._get(row.id, ('catalog', row.synced_at), lambda: Recipe.from_catalog(row))
+
+    def _get(self, recipe_id, version, build):
+        with self._lock:
+            entry = self._entries.get(recipe_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(recipe_id)
+                return entry[1]
+
+        recipe = build()
+        if recipe_id:
+            with self._lock:
+                self._entries[recipe_id] = (version, recipe)
+                self._entries.move_to_end(recipe_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return recipe
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared instance
+recipe_cache = RecipeCache()
@@ -0,0 +1,87 @@
+import threading
+import time
+from sqlalchemy import func
+from app import db
+
+# Every index created in this process, so newly processed recipes reach all of them
+_indexes = []
+
+
+def catalog_version():
+    """Cheap fingerprint of the local catalog, changes after every sync"""
+    from app.models import CatalogRecipe
+
+    count, last_synced = db.session.query(
+        func.count(CatalogRecipe.id),
+        func.max(CatalogRecipe.synced_at)
+    ).one()
+    return count, last_synced
+
+
+def observe_recipe(recipe):
+    """Feed a freshly processed recipe to every in-memory index"""
+    for index in _indexes:
+        index.add_recipe(recipe)
+
+
+class RecipeIndex:
+    """Base class for in-memory indexes over processed recipe data
+
+    Indexes are filled from the local catalog on first use, re-checked against
+    the catalog at most every refresh_interval seconds, and updated
+    incrementally with recipes fetched from the upstream API.
+    Subclasses implement _add(recipe) and _remove(recipe_id), called with the
+    index lock held, and keep indexed recipe ids as keys of self._doc_ids.
+    """
+
+    refresh_interval = 300
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._checked_at = None
+        self._doc_ids = {}
+        _indexes.append(self)
+
+    def ensure_fresh(self):
+        """Reload from the catalog if it changed since the last check (needs app context)"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+
+        self._checked_at = now
+        self._on_refresh()
+        version = catalog_version()
+        if version == self._version:
+            return
+
+        from app.service.recipe_service import RecipeService
+
+        recipes = list(RecipeService().iter_catalog_recipes())
+        with self._lock:
+            for recipe in recipes:
+                self._replace(recipe)
+            self._version = version
+
+    def add_recipe(self, recipe):
+        """Add a single processed recipe if it is not indexed yet"""
+        if not recipe or not recipe.get('id') or recipe['id'] in self._doc_ids:
+            return
+        with self._lock:
+            self._replace(recipe)
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def _on_refresh(self):
+        """Hook called on every periodic freshness check (app context available)"""
+
+    def _replace(self, recipe):
+        self._remove(recipe['id'])
+        self._add(recipe)
+
+    def _add(self, recipe):
+        raise NotImplementedError
+
+    def _remove(self, recipe_id):
+        raise NotImplementedError
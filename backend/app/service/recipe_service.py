@@ -1,53 +1,104 @@
 import requests
 from flask import current_app
+from app.service.http_client import upstream_client
+from app.service.cache import response_cache
+from app.service.singleflight import upstream_flights
+from app.service.catalog_service import local_catalog
+from app.service.recipe_index import observe_recipe
+from app.service.search_index import search_index
+from app.service.fuzzy_index import fuzzy_index
+from app.service.recipe_data import recipe_cache
+from app.utils.helpers import run_concurrently
 
 class RecipeService:
     """Service class for interacting with TheMealDB API"""
+
+    # Endpoints whose concurrent calls must not share a result
+    UNCOALESCED_ENDPOINTS = ('random.php',)
     
     def __init__(self):
         self.base_url = current_app.config['THEMEALDB_BASE_URL']
+        self.is_local = current_app.config['RECIPE_BACKEND'] == 'local'
+        self.client = local_catalog if self.is_local else upstream_client
+        self.cache = response_cache
+        self.flights = upstream_flights
+
+    def _get(self, endpoint, params=None):
+        """Call an API endpoint through the response cache and shared pooled client"""
+        if self.is_local:
+            # Local catalog lookups are already cheap, no need to cache them
+            return self.client.get_json(endpoint, params=params)
+        return self.cache.get_or_load(endpoint, params, lambda: self._fetch(endpoint, params))
+
+    def _fetch(self, endpoint, params=None):
+        """Fetch from upstream, sharing one in-flight call between identical concurrent requests"""
+        if endpoint in self.UNCOALESCED_ENDPOINTS:
+            return self.client.get_json(endpoint, params=params)
 
-    def search_by_name(self, query):
-        """Search recipes by name"""
+        key = self.cache.make_key(endpoint, params)
+        return self.flights.do(key, lambda: self.client.get_json(endpoint, params=params))
+
+    def search_by_name(self, query, fuzzy=True):
+        """Search recipes by name (with fuzzy, falls back to similar names when nothing matches exactly)"""
         try: 
-            url = f"{self.base_url}/search.php"
             params = {'s': query}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            data = self._get('search.php', params)
+            meals = data.get('meals') or []
+
+            # search.php returns full meals: let the fuzzy/suggest/pantry indexes learn them
+            for meal in meals:
+                observe_recipe(self._process_recipe_data(meal))
+
+            if not meals and fuzzy:
+                return self.fuzzy_search(query)
 
-            data = response.json()
             return {
                 'success': True,
-                'data': data.get('meals', []),
-                'count': len(data.get('meals',[]))
+                'data': meals,
+                'count': len(meals)
             }
         except requests.exceptions.RequestException as e:
             return {
-                'succes': False,
+                'success': False,
                 'error': f'API request failed: {str(e)}',
                 'data': []
             }
         
+    def fuzzy_search(self, query, limit=20):
+        """Typo-tolerant search over recipe and ingredient names with similarity scores"""
+        fuzzy_index.ensure_fresh()
+        results = fuzzy_index.search(query, limit=limit)
+        return {
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'fuzzy': True
+        }
+        
+    def full_text_search(self, query, limit=20):
+        """Ranked search over names, instructions, tags, category, area and ingredients"""
+        search_index.ensure_fresh()
+        total, results = search_index.search(query, limit=limit)
+        return {
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'total': total
+        }
+        
     def get_recipe_by_id(self, recipe_id):
         """Get detailed recipe information by ID"""
         try:
-            url = f"{self.base_url}/lookup.php"
-            params = {'i': recipe_id}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            recipe = self._lookup_recipe(recipe_id)
 
-            data = response.json()
-            meals = data.get('meals', [])
-
-            if not meals:
+            if recipe is None:
                 return {
                     'success': False,
                     'error': 'Recipe not found',
                     'data': None   
                 }
             
-            #proses data resetp agar frontend-friendly
-            recipe = self._process_recipe_data(meals[0])
+            observe_recipe(recipe)
 
             return {
                 'success': True,
@@ -59,20 +110,136 @@ class RecipeService:
                 'error' : f'API request failed : {str(e)}',
                 'data': None            
             }
+
+    def _lookup_recipe(self, recipe_id):
+        """Processed recipe for recipe_id, or None if it does not exist"""
+        if self.is_local:
+            # Straight from the catalog row, no TheMealDB-shaped dict in between
+            from app.models import CatalogRecipe
+
+            row = CatalogRecipe.query.get(str(recipe_id))
+            return recipe_cache.get_catalog(row) if row is not None else None
+
+        meals = self._get('lookup.php', {'i': recipe_id}).get('meals') or []
+        #proses data resetp agar frontend-friendly
+        return self._process_recipe_data(meals[0]) if meals else None
+        
+    def peek_recipe(self, recipe_id):
+        """Get recipe details from the local catalog or response cache only
+
+        Never calls the upstream API. Returns None when nothing is known locally,
+        otherwise the same result shape as get_recipe_by_id.
+        """
+        from app.models import CatalogRecipe
+
+        catalog_recipe = CatalogRecipe.query.get(str(recipe_id))
+        if catalog_recipe is not None:
+            return {
+                'success': True,
+                'data': recipe_cache.get_catalog(catalog_recipe)
+            }
+
+        data = self.cache.peek(self.cache.make_key('lookup.php', {'i': recipe_id}))
+        if data is None:
+            return None
+
+        meals = data.get('meals') or []
+        if not meals:
+            return {
+                'success': False,
+                'error': 'Recipe not found',
+                'data': None
+            }
+
+        return {
+            'success': True,
+            'data': self._process_recipe_data(meals[0])
+        }
+
+    def peek_recipe_summaries(self, recipe_ids):
+        """Name/image/category/area of many recipes from the local catalog or response cache only
+
+        Returns {recipe_id: {'name', 'image', 'category', 'area'} or None}; None
+        means the recipe is known not to exist. IDs that are not known locally
+        are left out.
+        """
+        from app.models import CatalogRecipe, CatalogCategory, CatalogArea
+
+        recipe_ids = [str(recipe_id) for recipe_id in recipe_ids]
+        rows = CatalogRecipe.query.with_entities(
+            CatalogRecipe.id, CatalogRecipe.name, CatalogRecipe.image,
+            CatalogCategory.name.label('category'), CatalogArea.name.label('area')
+        ).outerjoin(CatalogRecipe.category).outerjoin(CatalogRecipe.area).filter(
+            CatalogRecipe.id.in_(recipe_ids)
+        ).all()
+        summaries = {
+            row.id: {'name': row.name, 'image': row.image, 'category': row.category, 'area': row.area}
+            for row in rows
+        }
+
+        for recipe_id in recipe_ids:
+            if recipe_id in summaries:
+                continue
+            data = self.cache.peek(self.cache.make_key('lookup.php', {'i': recipe_id}))
+            if data is not None:
+                meals = data.get('meals') or []
+                summaries[recipe_id] = {
+                    'name': meals[0].get('strMeal'),
+                    'image': meals[0].get('strMealThumb'),
+                    'category': meals[0].get('strCategory'),
+                    'area': meals[0].get('strArea')
+                } if meals else None
+
+        return summaries
+
+    def get_recipes_by_ids(self, recipe_ids):
+        """Get detailed recipe information for many IDs at once
+
+        Cached recipes are answered directly, the rest are fetched concurrently.
+        """
+        recipe_ids = list(dict.fromkeys(str(recipe_id).strip() for recipe_id in recipe_ids if str(recipe_id).strip()))
+
+        results = {}
+        to_fetch = []
+        for recipe_id in recipe_ids:
+            if self.is_local or self.cache.contains(self.cache.make_key('lookup.php', {'i': recipe_id})):
+                results[recipe_id] = self.get_recipe_by_id(recipe_id)
+            else:
+                to_fetch.append(recipe_id)
+
+        fetched = run_concurrently(
+            [lambda recipe_id=recipe_id: self.get_recipe_by_id(recipe_id) for recipe_id in to_fetch],
+            max_workers=current_app.config['FANOUT_MAX_WORKERS']
+        )
+        results.update(zip(to_fetch, fetched))
+
+        recipes, not_found, failed = [], [], []
+        for recipe_id in recipe_ids:
+            result = results[recipe_id]
+            if result['success']:
+                recipes.append(result['data'])
+            elif result['error'] == 'Recipe not found':
+                not_found.append(recipe_id)
+            else:
+                failed.append(recipe_id)
+
+        return {
+            'success': True,
+            'data': recipes,
+            'count': len(recipes),
+            'not_found': not_found,
+            'failed': failed
+        }
         
     def search_by_ingredient(self, ingredient):
         """Search recipes by main ingredient"""
         try:
-            url = f"{self.base_url}/filter.php"
             params = {'i': ingredient}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get('filter.php', params)
             return { 
                 'success': True,
-                'data': data.get('meals', []),
-                'count': len(data.get('meals',[]))
+                'data': data.get('meals') or [],
+                'count': len(data.get('meals') or [])
             }
         except requests.exceptions.RequestException as e:
             return {
@@ -84,16 +251,12 @@ class RecipeService:
     def filter_by_category(self, category):
         """filter recipes by category"""
         try:
-            url = f"{self.base_url}/filter.php"
             params = {'c': category}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get('filter.php', params)
             return {
                 'success': True,
-                'data': data.get('meals',[]),
-                'count': len(data.get('meals',[]))
+                'data': data.get('meals') or [],
+                'count': len(data.get('meals') or [])
             }
         except requests.exceptions.RequestException as e:
             return {
@@ -105,16 +268,12 @@ class RecipeService:
     def filter_by_area(self, area):
         """Filter recipes by area"""
         try:
-            url = f"{self.base_url}/filter.php"
             params = {'a': area}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get('filter.php', params)
             return {
                 'success': True,
-                'data': data.get('meals',[]),
-                'count': len(data.get('meals',[]))
+                'data': data.get('meals') or [],
+                'count': len(data.get('meals') or [])
             }
         except requests.exceptions.RequestException as e:
             return {
@@ -126,11 +285,7 @@ class RecipeService:
     def get_categories(self):
         """Get all available categories"""
         try:
-            url = f"{self.base_url}/categories.php"
-            response = requests.get(url)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get('categories.php')
             return {
                 'success': True,
                 'data': data.get('categories',[])
@@ -142,15 +297,11 @@ class RecipeService:
                 'data': [],
             }
         
-    def get_area(self):
-        """Get all available area"""
+    def get_areas(self):
+        """Get all available areas"""
         try:
-            url = f"{self.base_url}/list.php"
-            params = {'a': list}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
+            params = {'a': 'list'}
+            data = self._get('list.php', params)
             return {
                 'success': True,
                 'data': data.get('meals',[])
@@ -163,23 +314,38 @@ class RecipeService:
             }
         
     def get_random_recipe(self):
-        """Get a random recipe"""
+        """Get a random recipe, from the prefetched pool when it has one"""
+        from app.service.random_pool import random_pool
+
+        recipe = random_pool.pop()
+        if recipe is not None:
+            return {
+                'success': True,
+                'data': recipe
+            }
+        return self.fetch_random_recipe()
+    
+    def fetch_random_recipe(self):
+        """Get a random recipe straight from the API (or local catalog)"""
         try:
-            url = f"{self.base_url}/random.php"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            data = response.json()
-            meals = data.get('meals', [])
+            if self.is_local:
+                from sqlalchemy import func
+                from app.models import CatalogRecipe
+
+                row = CatalogRecipe.query.order_by(func.random()).first()
+                recipe = recipe_cache.get_catalog(row) if row is not None else None
+            else:
+                meals = self._get('random.php').get('meals') or []
+                recipe = self._process_recipe_data(meals[0]) if meals else None
             
-            if not meals:
+            if recipe is None:
                 return {
                     'success': False,
                     'error': 'No random recipe found',
                     'data': None
                 }
             
-            recipe = self._process_recipe_data(meals[0])
+            observe_recipe(recipe)
             
             return {
                 'success': True,
@@ -192,31 +358,69 @@ class RecipeService:
                 'data': None
             }
     
-    def _process_recipe_data(self, raw_recipe):
-        """Process raw recipe data from API to make it more structured"""
-        # Extract ingredients and measurements
-        ingredients = []
-        for i in range(1, 21):  # TheMealDB has up to 20 ingredients
-            ingredient = raw_recipe.get(f'strIngredient{i}', '').strip()
-            measure = raw_recipe.get(f'strMeasure{i}', '').strip()
-            
-            if ingredient and ingredient.lower() != 'null':
-                ingredients.append({
-                    'ingredient': ingredient,
-                    'measure': measure if measure and measure.lower() != 'null' else ''
-                })
-        
-        # Return structured recipe data
+    def advanced_search(self, query=None, ingredients=(), category=None, area=None, match_all=True):
+        """Search with several filters at once
+
+        Every supplied filter is fetched concurrently and results are combined by
+        idMeal. With match_all only recipes matching every filter are kept,
+        otherwise any match counts. Results are ordered by number of filters matched.
+        """
+        searches = []
+        if query:
+            # Exact name matches only, approximate ones would count as hits on query
+            searches.append(lambda: self.search_by_name(query, fuzzy=False))
+        for ingredient in ingredients:
+            searches.append(lambda ingredient=ingredient: self.search_by_ingredient(ingredient))
+        if category:
+            searches.append(lambda: self.filter_by_category(category))
+        if area:
+            searches.append(lambda: self.filter_by_area(area))
+
+        results = run_concurrently(searches, max_workers=current_app.config['FANOUT_MAX_WORKERS'])
+
+        failed = [result for result in results if not result['success']]
+        if failed:
+            return {
+                'success': False,
+                'error': failed[0]['error'],
+                'data': []
+            }
+
+        # Count matches per recipe, keeping the richest object seen (search.php returns full meals)
+        matches = {}
+        recipes = {}
+        for result in results:
+            for recipe in result['data']:
+                recipe_id = recipe.get('idMeal')
+                matches[recipe_id] = matches.get(recipe_id, 0) + 1
+                if len(recipe) > len(recipes.get(recipe_id, ())):
+                    recipes[recipe_id] = recipe
+
+        required = len(searches) if match_all else 1
+        ranked = sorted(
+            (recipe_id for recipe_id, count in matches.items() if count >= required),
+            key=lambda recipe_id: (-matches[recipe_id], recipes[recipe_id].get('strMeal') or '')
+        )
+        data = [dict(recipes[recipe_id], match_count=matches[recipe_id]) for recipe_id in ranked]
+
         return {
-            'id': raw_recipe.get('idMeal'),
-            'name': raw_recipe.get('strMeal'),
-            'category': raw_recipe.get('strCategory'),
-            'area': raw_recipe.get('strArea'),
-            'instructions': raw_recipe.get('strInstructions'),
-            'image': raw_recipe.get('strMealThumb'),
-            'tags': raw_recipe.get('strTags', '').split(',') if raw_recipe.get('strTags') else [],
-            'youtube': raw_recipe.get('strYoutube'),
-            'ingredients': ingredients,
-            'source': raw_recipe.get('strSource')
+            'success': True,
+            'data': data,
+            'count': len(data),
+            'criteria_count': len(searches)
         }
-    
\ No newline at end of file
+
+    def _process_recipe_data(self, raw_recipe):
+        """Process raw recipe data from API to make it more structured
+
+        Returns a shared, immutable Recipe (built once per recipe and cached);
+        it reads like the old dict and serializes to the same JSON.
+        """
+        return recipe_cache.get(raw_recipe)
+    
+    def iter_catalog_recipes(self):
+        """Yield every recipe in the local catalog as processed recipe data"""
+        from app.models import CatalogRecipe
+
+        for recipe in CatalogRecipe.query.order_by(CatalogRecipe.id).all():
+            yield recipe_cache.get_catalog(recipe)
@@ -0,0 +1,160 @@
+import heapq
+import threading
+import time
+from array import array
+from datetime import datetime
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, select
+from app import db
+from app.models import Favorite, RecipeNeighbor
+
+
+def compute_item_neighbors(user_ids, recipe_ids, k=20, block_size=2048):
+    """Top-k most similar recipes for every recipe from (user_id, recipe_id) favorite pairs
+
+    Builds a binary users x recipes sparse matrix and scores recipe pairs by
+    cosine similarity of their favoriting users (co-favorites / sqrt(n_a * n_b)).
+    The recipes x recipes co-occurrence matrix is computed block_size rows at a
+    time so memory stays bounded. Yields (recipe_id, neighbor ids, scores), best first.
+    """
+    if not len(recipe_ids):
+        return
+
+    items, cols = np.unique(np.asarray(recipe_ids), return_inverse=True)
+    _, rows = np.unique(np.asarray(user_ids), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(rows.max() + 1, len(items))
+    )
+    matrix.data[:] = 1.0  # duplicate pairs were summed
+    norms = np.sqrt(np.asarray(matrix.sum(axis=0), dtype=np.float32).ravel())
+    transposed = matrix.T.tocsr()
+
+    for start in range(0, len(items), block_size):
+        cooccurrence = (transposed[start:start + block_size] @ matrix).tocsr()
+        for offset in range(cooccurrence.shape[0]):
+            item = start + offset
+            begin, end = cooccurrence.indptr[offset], cooccurrence.indptr[offset + 1]
+            neighbors = cooccurrence.indices[begin:end]
+            keep = neighbors != item
+            neighbors = neighbors[keep]
+            if not len(neighbors):
+                continue
+
+            scores = cooccurrence.data[begin:end][keep] / (norms[item] * norms[neighbors])
+            if len(scores) > k:
+                best = np.argpartition(-scores, k)[:k]
+                neighbors, scores = neighbors[best], scores[best]
+            order = np.lexsort((neighbors, -scores))
+            yield str(items[item]), items[neighbors[order]], scores[order]
+
+
+def rebuild_neighbors(k=20, batch_size=10000):
+    """Recompute the recipe_neighbors table from all favorites. Does not commit.
+
+    Returns the number of recipes that got neighbors.
+    """
+    user_ids = []
+    recipe_ids = []
+    for user_id, recipe_id in db.session.execute(
+        select(Favorite.user_id, Favorite.recipe_id).execution_options(yield_per=batch_size)
+    ):
+        user_ids.append(user_id)
+        recipe_ids.append(recipe_id)
+
+    computed_at = datetime.utcnow()
+    table = RecipeNeighbor.__table__
+    db.session.execute(delete(table))
+
+    recipes = 0
+    rows = []
+    for recipe_id, neighbors, scores in compute_item_neighbors(user_ids, recipe_ids, k=k):
+        recipes += 1
+        rows.extend(
+            {'recipe_id': recipe_id, 'rank': rank, 'neighbor_id': str(neighbor), 'score': float(score), 'computed_at': computed_at}
+            for rank, (neighbor, score) in enumerate(zip(neighbors, scores))
+        )
+        if len(rows) >= batch_size:
+            db.session.execute(table.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(table.insert(), rows)
+
+    return recipes
+
+
+class ItemNeighbors:
+    """In-memory copy of the recipe_neighbors table used to serve recommendations
+
+    Reloaded whenever a newer batch run is found (checked at most every
+    reload_interval seconds). Neighbor IDs are kept as tuples and scores as
+    compact float arrays.
+    """
+
+    def __init__(self, reload_interval=300):
+        self.reload_interval = reload_interval
+        self._neighbors = {}   # recipe id -> (neighbor ids, array('f') of scores)
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.reload_interval = app.config['RECOMMENDATION_RELOAD_SECONDS']
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+                return
+            version = db.session.scalar(select(func.max(RecipeNeighbor.computed_at)))
+            if version != self._version:
+                self._load()
+                self._version = version
+            self._checked_at = now
+
+    def _load(self):
+        grouped = {}
+        rows = db.session.execute(
+            select(RecipeNeighbor.recipe_id, RecipeNeighbor.neighbor_id, RecipeNeighbor.score)
+            .order_by(RecipeNeighbor.recipe_id, RecipeNeighbor.rank)
+        )
+        for recipe_id, neighbor_id, score in rows:
+            ids, scores = grouped.setdefault(recipe_id, ([], array('f')))
+            ids.append(neighbor_id)
+            scores.append(score)
+        self._neighbors = {recipe_id: (tuple(ids), scores) for recipe_id, (ids, scores) in grouped.items()}
+
+    def neighbors(self, recipe_id):
+        """(neighbor ids, scores) of a recipe, best first"""
+        self.ensure_fresh()
+        return self._neighbors.get(str(recipe_id), ((), ()))
+
+    def recommend(self, liked_ids, limit=10):
+        """Recipes most similar to the liked ones, as (recipe_id, score, based_on) best first
+
+        A candidate's score is the sum of its similarity to each liked recipe;
+        based_on is the liked recipe that contributed most.
+        """
+        self.ensure_fresh()
+        liked = set(liked_ids)
+        scores = {}
+        based_on = {}
+        for recipe_id in liked:
+            ids, similarities = self._neighbors.get(recipe_id, ((), ()))
+            for neighbor_id, similarity in zip(ids, similarities):
+                if neighbor_id in liked:
+                    continue
+                scores[neighbor_id] = scores.get(neighbor_id, 0.0) + similarity
+                if similarity > based_on.get(neighbor_id, (0.0, None))[0]:
+                    based_on[neighbor_id] = (similarity, recipe_id)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(recipe_id, score, based_on[recipe_id][1]) for recipe_id, score in best]
+
+
+# Shared neighbor table (initialized in create_app)
+item_neighbors = ItemNeighbors()
@@ -0,0 +1,196 @@
+import math
+import re
+from bisect import bisect_left
+from app.service.recipe_index import RecipeIndex
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Field weights (term frequency multiplier) and the order fields are laid out in
+FIELD_WEIGHTS = (
+    ('name', 3.0),
+    ('tags', 2.0),
+    ('category', 2.0),
+    ('area', 2.0),
+    ('ingredients', 1.5),
+    ('instructions', 1.0)
+)
+# Position gap between fields so phrases never match across them
+FIELD_GAP = 1000
+MAX_PREFIX_EXPANSION = 50
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex(RecipeIndex):
+    """Pure-Python BM25 full-text index over recipe names, tags, ingredients and instructions
+
+    Supports plain terms (ranked OR), "quoted phrases" (must match, in order)
+    and prefix terms ending with * (chick*).
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}      # term -> {doc: (weighted tf, positions)}
+        self._docs = []          # doc number -> summary dict or None
+        self._doc_lengths = []   # doc number -> weighted length
+        self._doc_terms = []     # doc number -> terms (for removal)
+        self._free = []
+        self._total_length = 0.0
+        self._sorted_terms = None
+
+    def _fields(self, recipe):
+        return {
+            'name': recipe.get('name'),
+            'tags': ' '.join(recipe.get('tags') or []),
+            'category': recipe.get('category'),
+            'area': recipe.get('area'),
+            'ingredients': ' '.join(item['ingredient'] for item in recipe.get('ingredients', [])),
+            'instructions': recipe.get('instructions')
+        }
+
+    def _add(self, recipe):
+        fields = self._fields(recipe)
+        terms = {}
+        length = 0.0
+        offset = 0
+        for field, weight in FIELD_WEIGHTS:
+            tokens = tokenize(fields[field])
+            for position, token in enumerate(tokens):
+                tf, positions = terms.get(token, (0.0, []))
+                positions.append(offset + position)
+                terms[token] = (tf + weight, positions)
+            length += weight * len(tokens)
+            offset += len(tokens) + FIELD_GAP
+
+        summary = {
+            'idMeal': recipe['id'],
+            'strMeal': recipe.get('name'),
+            'strMealThumb': recipe.get('image'),
+            'strCategory': recipe.get('category'),
+            'strArea': recipe.get('area')
+        }
+        if self._free:
+            doc = self._free.pop()
+            self._docs[doc] = summary
+            self._doc_lengths[doc] = length
+            self._doc_terms[doc] = tuple(terms)
+        else:
+            doc = len(self._docs)
+            self._docs.append(summary)
+            self._doc_lengths.append(length)
+            self._doc_terms.append(tuple(terms))
+        self._doc_ids[recipe['id']] = doc
+        self._total_length += length
+
+        for term, (tf, positions) in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._sorted_terms = None
+            self._postings[term][doc] = (tf, tuple(positions))
+
+    def _remove(self, recipe_id):
+        doc = self._doc_ids.pop(recipe_id, None)
+        if doc is None:
+            return
+
+        for term in self._doc_terms[doc]:
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+
+        self._total_length -= self._doc_lengths[doc]
+        self._docs[doc] = None
+        self._doc_lengths[doc] = 0.0
+        self._doc_terms[doc] = ()
+        self._free.append(doc)
+
+    def _expand_prefix(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = []
+        i = bisect_left(self._sorted_terms, prefix)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(prefix):
+            terms.append(self._sorted_terms[i])
+            if len(terms) >= MAX_PREFIX_EXPANSION:
+                break
+            i += 1
+        return terms
+
+    def _phrase_docs(self, tokens):
+        """Docs where tokens appear consecutively"""
+        if not tokens or any(token not in self._postings for token in tokens):
+            return set()
+
+        candidates = set(self._postings[tokens[0]])
+        for token in tokens[1:]:
+            candidates &= self._postings[token].keys()
+
+        matches = set()
+        for doc in candidates:
+            starts = set(self._postings[tokens[0]][doc][1])
+            for offset, token in enumerate(tokens[1:], start=1):
+                starts &= {position - offset for position in self._postings[token][doc][1]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def parse_query(self, query):
+        """Split a query into (terms, prefixes, phrases)"""
+        terms, prefixes, phrases = [], [], []
+        for phrase, word in QUERY_RE.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    phrases.append(tokens)
+                terms.extend(tokens)
+            elif word.endswith('*') and tokenize(word):
+                prefixes.append(tokenize(word)[0])
+            else:
+                terms.extend(tokenize(word))
+        return terms, prefixes, phrases
+
+    def search(self, query, limit=20):
+        """Return (total matches, ranked summaries with scores)"""
+        terms, prefixes, phrases = self.parse_query(query)
+
+        with self._lock:
+            doc_count = len(self._doc_ids)
+            if not doc_count:
+                return 0, []
+            average_length = self._total_length / doc_count
+
+            query_terms = set(terms)
+            for prefix in prefixes:
+                query_terms.update(self._expand_prefix(prefix))
+
+            scores = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, (tf, _) in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc] / average_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            for tokens in phrases:
+                allowed = self._phrase_docs(tokens)
+                scores = {doc: score for doc, score in scores.items() if doc in allowed}
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._docs[item[0]]['strMeal'] or ''))
+            results = [dict(self._docs[doc], score=round(score, 4)) for doc, score in ranked[:limit]]
+            return len(scores), results
+
+
+# Shared index instance
+search_index = SearchIndex()
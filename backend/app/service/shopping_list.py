@@ -0,0 +1,146 @@
+import re
+from array import array
+from functools import lru_cache
+import numpy as np
+from app.utils.helpers import normalize_name
+
+# unit word -> (canonical unit, factor); weights become grams, volumes millilitres
+UNITS = {
+    'g': ('g', 1.0), 'gr': ('g', 1.0), 'gram': ('g', 1.0), 'grams': ('g', 1.0),
+    'kg': ('g', 1000.0), 'kilo': ('g', 1000.0), 'kilogram': ('g', 1000.0), 'kilograms': ('g', 1000.0),
+    'oz': ('g', 28.35), 'ounce': ('g', 28.35), 'ounces': ('g', 28.35),
+    'lb': ('g', 453.59), 'lbs': ('g', 453.59), 'pound': ('g', 453.59), 'pounds': ('g', 453.59),
+    'ml': ('ml', 1.0), 'millilitre': ('ml', 1.0), 'millilitres': ('ml', 1.0), 'milliliter': ('ml', 1.0),
+    'cl': ('ml', 10.0), 'dl': ('ml', 100.0),
+    'l': ('ml', 1000.0), 'litre': ('ml', 1000.0), 'litres': ('ml', 1000.0), 'liter': ('ml', 1000.0), 'liters': ('ml', 1000.0),
+    'tsp': ('ml', 5.0), 'tsps': ('ml', 5.0), 'teaspoon': ('ml', 5.0), 'teaspoons': ('ml', 5.0),
+    'tbsp': ('ml', 15.0), 'tbsps': ('ml', 15.0), 'tbs': ('ml', 15.0), 'tblsp': ('ml', 15.0), 'tbls': ('ml', 15.0),
+    'tablespoon': ('ml', 15.0), 'tablespoons': ('ml', 15.0),
+    'cup': ('ml', 240.0), 'cups': ('ml', 240.0),
+    'fl oz': ('ml', 29.57), 'pint': ('ml', 473.0), 'pints': ('ml', 473.0), 'quart': ('ml', 946.0), 'quarts': ('ml', 946.0)
+}
+# Countable units, plural -> singular
+COUNT_UNITS = {
+    'clove': 'clove', 'cloves': 'clove', 'can': 'can', 'cans': 'can', 'tin': 'tin', 'tins': 'tin',
+    'slice': 'slice', 'slices': 'slice', 'pinch': 'pinch', 'pinches': 'pinch', 'handful': 'handful',
+    'handfuls': 'handful', 'sprig': 'sprig', 'sprigs': 'sprig', 'stick': 'stick', 'sticks': 'stick',
+    'bunch': 'bunch', 'bunches': 'bunch', 'piece': 'piece', 'pieces': 'piece', 'packet': 'packet',
+    'packets': 'packet', 'sheet': 'sheet', 'sheets': 'sheet', 'leaf': 'leaf', 'leaves': 'leaf',
+    'dash': 'dash', 'drop': 'drop', 'drops': 'drop'
+}
+VULGAR_FRACTIONS = {'¼': 0.25, '½': 0.5, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3, '⅛': 0.125}
+
+# "1,000" is a thousands separator, "1,5" a decimal comma
+THOUSANDS = r'\d{1,3}(?:,\d{3})+(?!\d)'
+THOUSANDS_RE = re.compile(THOUSANDS)
+NUMBER = rf'(?:\d+\s+\d+/\d+|\d+/\d+|(?:{THOUSANDS}|\d+(?:[.,]\d+)?)\s*[¼½¾⅓⅔⅛]?|[¼½¾⅓⅔⅛])'
+MEASURE_RE = re.compile(rf'^\s*(?P<quantity>{NUMBER})(?:\s*(?:-|to)\s*(?P<upper>{NUMBER}))?\s*(?P<rest>.*)$')
+
+
+def _number(text):
+    total = 0.0
+    for part in text.split():
+        for char, value in VULGAR_FRACTIONS.items():
+            if part.endswith(char):
+                total += value
+                part = part[:-1]
+        if '/' in part:
+            numerator, denominator = part.split('/')
+            total += float(numerator) / float(denominator) if float(denominator) else 0.0
+        elif part:
+            total += float(part.replace(',', '') if THOUSANDS_RE.fullmatch(part) else part.replace(',', '.'))
+    return total
+
+
+@lru_cache(maxsize=8192)
+def parse_measure(measure):
+    """Parse a free-text measure into (quantity, canonical unit)
+
+    Weights are converted to g, volumes to ml, countable units to their
+    singular name and bare numbers to '' (pieces). Ranges ("1-2") use the
+    upper bound, "2 x 400g" is multiplied out. Returns (None, None) for text
+    without a quantity ("to taste").
+    """
+    measure = (measure or '').lower().strip()
+    match = MEASURE_RE.match(measure)
+    if not match:
+        unit = measure.split()[0] if measure else ''
+        return (1.0, COUNT_UNITS[unit]) if unit in COUNT_UNITS else (None, None)
+
+    quantity = _number(match.group('upper') or match.group('quantity'))
+    rest = match.group('rest')
+    if rest.startswith('x '):
+        inner, unit = parse_measure(rest[2:])
+        if inner is not None:
+            return quantity * inner, unit
+
+    words = rest.replace('.', ' ').split()
+    if words[:2] == ['fl', 'oz']:
+        words = ['fl oz'] + words[2:]
+
+    unit = words[0] if words else ''
+    if unit in UNITS:
+        canonical, factor = UNITS[unit]
+        return quantity * factor, canonical
+    if unit in COUNT_UNITS:
+        return quantity, COUNT_UNITS[unit]
+    return quantity, ''
+
+
+def format_quantity(quantity, unit):
+    """Round and scale a summed quantity for display (1500 g -> 1.5 kg)"""
+    if unit in ('g', 'ml') and quantity >= 1000:
+        return round(quantity / 1000, 2), 'kg' if unit == 'g' else 'l'
+    return round(quantity, 2), unit
+
+
+def aggregate_ingredients(recipes):
+    """Merge the ingredients of processed recipes into one shopping list
+
+    recipes is a sequence of processed recipe dicts, one per planned meal (a
+    recipe planned twice appears twice). Identical ingredients with compatible
+    units are summed with a single vectorized group-by; measures without a
+    quantity are kept as notes.
+    """
+    keys = {}            # (normalized ingredient, unit) -> group number
+    names = []           # group number -> display name
+    codes = array('i')
+    quantities = array('d')
+    recipe_names = {}    # group number -> recipe names
+    notes = {}           # group number -> unparsed measures
+
+    for recipe in recipes:
+        for item in recipe.get('ingredients', []):
+            ingredient = normalize_name(item['ingredient'])
+            quantity, unit = parse_measure(item.get('measure') or '')
+
+            key = (ingredient, unit)
+            group = keys.get(key)
+            if group is None:
+                group = keys[key] = len(names)
+                names.append(item['ingredient'].strip())
+            codes.append(group)
+            quantities.append(quantity or 0.0)
+            recipe_names.setdefault(group, set()).add(recipe.get('name') or recipe.get('id'))
+            if quantity is None and item.get('measure'):
+                notes.setdefault(group, set()).add(item['measure'].strip())
+
+    totals = np.bincount(
+        np.frombuffer(codes, dtype=np.int32),
+        weights=np.frombuffer(quantities, dtype=np.float64),
+        minlength=len(names)
+    )
+
+    items = []
+    for (ingredient, unit), group in keys.items():
+        quantity, display_unit = format_quantity(float(totals[group]), unit) if unit is not None else (None, None)
+        items.append({
+            'ingredient': names[group],
+            'quantity': quantity,
+            'unit': display_unit,
+            'notes': sorted(notes.get(group, ())),
+            'recipes': sorted(recipe_names[group])
+        })
+
+    items.sort(key=lambda item: (item['ingredient'].lower(), item['unit'] or ''))
+    return items
@@ -0,0 +1,198 @@
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from app.service.recipe_index import RecipeIndex
+from app.utils.helpers import normalize_name
+
+# Weight of each feature kind on top of its IDF: sharing ingredients matters
+# most, category and area break ties between similar ingredient lists
+FEATURE_WEIGHTS = {'ingredient': 1.0, 'category': 0.6, 'area': 0.4}
+
+
+def recipe_features(recipe):
+    """Feature kind/value pairs of a processed recipe"""
+    features = [('ingredient', normalize_name(item['ingredient'])) for item in recipe.get('ingredients', [])]
+    for kind in ('category', 'area'):
+        if recipe.get(kind):
+            features.append((kind, normalize_name(recipe[kind])))
+    return tuple(dict.fromkeys(feature for feature in features if feature[1]))
+
+
+class SimilarIndex(RecipeIndex):
+    """Precomputed content-based neighbors from TF-IDF ingredient/category/area vectors
+
+    Recipes are L2-normalized TF-IDF vectors; all pairwise cosine similarities
+    are computed block_size rows at a time as sparse x sparse.T matrix products
+    and only the top k neighbors per recipe are kept, as one (recipes x k) int32
+    array plus a float32 array of scores. A lookup is a single row slice.
+    Rebuilds run in a background thread at most every rebuild_interval seconds
+    after changes and swap the new arrays in when done; recipes added since the
+    last build are scored on their own against the last built matrix.
+    """
+
+    rebuild_interval = 60
+
+    def __init__(self, k=20, block_size=256):
+        super().__init__()
+        self.k = k
+        self.block_size = block_size
+        self._docs = {}               # recipe id -> (features, summary dict)
+        self._dirty = False
+        self._built_at = None
+        self._rebuilding = False
+        self._rows = {}               # recipe id -> row in the neighbor arrays
+        self._ids = []                # row -> recipe id
+        self._neighbors = np.empty((0, k), dtype=np.int32)
+        self._scores = np.empty((0, k), dtype=np.float32)
+        self._matrix = None           # (vectors, vocabulary, idf) of the last build
+
+    def _add(self, recipe):
+        self._doc_ids[recipe['id']] = True
+        self._docs[recipe['id']] = (recipe_features(recipe), {
+            'idMeal': recipe['id'],
+            'strMeal': recipe.get('name'),
+            'strMealThumb': recipe.get('image'),
+            'strCategory': recipe.get('category'),
+            'strArea': recipe.get('area')
+        })
+        self._dirty = True
+
+    def _remove(self, recipe_id):
+        if self._doc_ids.pop(recipe_id, None) is not None:
+            del self._docs[recipe_id]
+            self._dirty = True
+
+    @staticmethod
+    def _vectors(ids, features):
+        """Row-normalized TF-IDF matrix (recipes x features) for ids, plus its vocabulary and idf"""
+        vocabulary = {}
+        rows, cols, weights = [], [], []
+        for row, recipe_id in enumerate(ids):
+            for feature in features[recipe_id]:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(feature, len(vocabulary)))
+                weights.append(FEATURE_WEIGHTS[feature[0]])
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(weights, dtype=np.float32), (rows, cols)),
+            shape=(len(ids), len(vocabulary))
+        )
+        document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+        idf = np.log(max(len(ids), 1) / np.maximum(document_frequency, 1)).astype(np.float32) + 1.0
+        matrix = matrix @ sparse.diags(idf)
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32), vocabulary, idf
+
+    def rebuild(self):
+        """Recompute the top-k neighbor arrays for every indexed recipe
+
+        Works on a snapshot without holding the index lock, lookups are served
+        from the previous arrays until the new ones are swapped in.
+        """
+        with self._lock:
+            features = {recipe_id: doc[0] for recipe_id, doc in self._docs.items()}
+            self._dirty = False
+
+        ids = sorted(features)
+        k = min(self.k, max(len(ids) - 1, 0))
+        neighbors = np.full((len(ids), self.k), -1, dtype=np.int32)
+        scores = np.zeros((len(ids), self.k), dtype=np.float32)
+
+        vectors, vocabulary, idf = self._vectors(ids, features)
+        if k:
+            transposed = vectors.T.tocsc()
+            for start in range(0, len(ids), self.block_size):
+                block = (vectors[start:start + self.block_size] @ transposed).toarray()
+                block[np.arange(len(block)), np.arange(start, start + len(block))] = -1.0  # not itself
+                best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(block, best, axis=1)
+                order = np.argsort(-best_scores, axis=1, kind='stable')
+                neighbors[start:start + len(block), :k] = np.take_along_axis(best, order, axis=1)
+                scores[start:start + len(block), :k] = np.take_along_axis(best_scores, order, axis=1)
+            neighbors[scores <= 0] = -1
+
+        with self._lock:
+            self._ids = ids
+            self._rows = {recipe_id: row for row, recipe_id in enumerate(ids)}
+            self._neighbors = neighbors
+            self._scores = scores
+            self._matrix = (vectors, vocabulary, idf)
+            self._built_at = time.monotonic()
+
+    def _request_rebuild(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"❌ Similar recipe index rebuild error: {e}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name='similar-index-rebuild', daemon=True).start()
+
+    def _score_one(self, features, limit):
+        """(rows, scores) of the best matches for a recipe that is not in the neighbor arrays yet"""
+        if self._matrix is None:
+            # Nothing built yet: vectorize what is indexed now, the background build follows
+            ids = sorted(self._docs)
+            self._matrix = self._vectors(ids, {recipe_id: self._docs[recipe_id][0] for recipe_id in ids})
+            self._ids = ids
+
+        vectors, vocabulary, idf = self._matrix
+        unseen_idf = np.log(max(vectors.shape[0], 1)) + 1.0
+        weights = np.zeros(len(vocabulary), dtype=np.float32)
+        norm = 0.0
+        for feature in features:
+            column = vocabulary.get(feature)
+            weight = FEATURE_WEIGHTS[feature[0]] * (idf[column] if column is not None else unseen_idf)
+            norm += weight * weight
+            if column is not None:
+                weights[column] = weight
+        if not norm or not vectors.shape[0]:
+            return [], []
+
+        similarities = vectors @ (weights / np.sqrt(norm))
+        limit = min(limit, len(similarities))
+        best = np.argpartition(-similarities, limit - 1)[:limit]
+        best = best[np.argsort(-similarities[best], kind='stable')]
+        best = best[similarities[best] > 0]
+        return best.tolist(), similarities[best].tolist()
+
+    def similar(self, recipe_id, limit=10):
+        """Most similar recipes to recipe_id as summary dicts with a similarity score (None if not indexed)"""
+        with self._lock:
+            if recipe_id not in self._docs:
+                return None
+
+            row = self._rows.get(recipe_id)
+            if row is not None:
+                neighbors = self._neighbors[row, :limit].tolist()
+                scores = self._scores[row, :limit].tolist()
+            else:
+                neighbors, scores = self._score_one(self._docs[recipe_id][0], limit + 1)
+
+            results = [
+                dict(self._docs[self._ids[neighbor]][1], similarity=round(float(score), 4))
+                for neighbor, score in zip(neighbors, scores)
+                if neighbor >= 0 and self._ids[neighbor] != recipe_id and self._ids[neighbor] in self._docs
+            ][:limit]
+            stale = self._dirty and (
+                self._built_at is None or time.monotonic() - self._built_at >= self.rebuild_interval
+            )
+
+        if stale:
+            self._request_rebuild()
+        return results
+
+
+# Shared index instance
+similar_index = SimilarIndex()
@@ -0,0 +1,132 @@
+from bisect import bisect_left, insort
+from app.service.recipe_index import RecipeIndex
+from app.utils.helpers import normalize_name
+
+RECIPE = 'recipe'
+INGREDIENT = 'ingredient'
+CATEGORY = 'category'
+AREA = 'area'
+
+# How many prefix matches to look at before ranking by popularity
+SCAN_LIMIT = 500
+
+
+class SuggestIndex(RecipeIndex):
+    """Prefix autocomplete over recipe, ingredient, category and area names
+
+    Keeps a sorted list of (normalized text, kind, name) keys searched with
+    bisect. Every word start of a name is a key too, so "cur" finds
+    "Chicken Curry". Suggestions are ranked by the in-memory favorite counts
+    of popularity_tracker, re-read on every refresh check. The total number
+    of keys is capped by max_keys.
+    """
+
+    def __init__(self, max_keys=100000):
+        super().__init__()
+        self.max_keys = max_keys
+        self._keys = []          # sorted (normalized text, kind, normalized name)
+        self._entries = {}       # (kind, normalized name) -> [display name, recipe ids, popularity]
+        self._favorites = {}     # recipe id -> favorite count
+
+    def _on_refresh(self):
+        from app.service.popularity import popularity_tracker
+
+        favorites = popularity_tracker.counts()
+        with self._lock:
+            self._favorites = favorites
+            for entry in self._entries.values():
+                entry[2] = sum(favorites.get(recipe_id, 0) for recipe_id in entry[1])
+
+    def _key_texts(self, normalized):
+        words = normalized.split()
+        return [' '.join(words[i:]) for i in range(len(words))]
+
+    def _add_name(self, name, kind, recipe_id):
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+
+        entry_key = (kind, normalized)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            texts = self._key_texts(normalized)
+            if len(self._keys) + len(texts) > self.max_keys:
+                return None
+            entry = self._entries[entry_key] = [name, set(), 0]
+            for text in texts:
+                insort(self._keys, (text, kind, normalized))
+
+        if recipe_id not in entry[1]:
+            entry[1].add(recipe_id)
+            entry[2] += self._favorites.get(recipe_id, 0)
+        return entry_key
+
+    def _drop_name(self, entry_key):
+        kind, normalized = entry_key
+        for text in self._key_texts(normalized):
+            key = (text, kind, normalized)
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+        del self._entries[entry_key]
+
+    def _add(self, recipe):
+        recipe_id = recipe['id']
+        names = [(recipe.get('name'), RECIPE), (recipe.get('category'), CATEGORY), (recipe.get('area'), AREA)]
+        names.extend((item['ingredient'], INGREDIENT) for item in recipe.get('ingredients', []))
+
+        entry_keys = set()
+        for name, kind in names:
+            entry_key = self._add_name(name, kind, recipe_id)
+            if entry_key is not None:
+                entry_keys.add(entry_key)
+        self._doc_ids[recipe_id] = tuple(entry_keys)
+
+    def _remove(self, recipe_id):
+        entry_keys = self._doc_ids.pop(recipe_id, None)
+        if entry_keys is None:
+            return
+
+        for entry_key in entry_keys:
+            entry = self._entries[entry_key]
+            entry[1].discard(recipe_id)
+            entry[2] -= self._favorites.get(recipe_id, 0)
+            if not entry[1]:
+                self._drop_name(entry_key)
+
+    def suggest(self, prefix, kinds=None, limit=10):
+        """Names starting (at any word) with prefix, most favorited first"""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            seen = set()
+            candidates = []
+            i = bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(seen) < SCAN_LIMIT:
+                text, kind, normalized = self._keys[i]
+                if not text.startswith(prefix):
+                    break
+                i += 1
+                if (kinds and kind not in kinds) or (kind, normalized) in seen:
+                    continue
+                seen.add((kind, normalized))
+                name, recipe_ids, popularity = self._entries[(kind, normalized)]
+                # Prefer matches at the start of the name, then shorter names
+                candidates.append((-popularity, not normalized.startswith(prefix), len(normalized), name, kind, recipe_ids))
+
+            candidates.sort(key=lambda candidate: candidate[:4])
+            return [
+                {
+                    'text': name,
+                    'type': kind,
+                    'id': next(iter(recipe_ids)) if kind == RECIPE else None,
+                    'popularity': -popularity
+                }
+                for popularity, _, _, name, kind, recipe_ids in candidates[:limit]
+            ]
+
+
+# Shared index instance
+suggest_index = SuggestIndex()
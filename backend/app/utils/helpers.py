@@ -0,0 +1,53 @@
+# Compact recipe shape of list endpoints (TheMealDB field names)
+SUMMARY_FIELDS = ('idMeal', 'strMeal', 'strMealThumb', 'strCategory', 'strArea')
+# Per-result ranking info that list endpoints keep in the summary shape
+RANKING_FIELDS = ('score', 'similarity', 'matched', 'match_count', 'favorite_count')
+
+
+def parse_fields(value):
+    """Field names from a comma separated ?fields= value"""
+    return tuple(dict.fromkeys(field.strip() for field in (value or '').split(',') if field.strip()))
+
+
+def project_fields(items, fields, keep=()):
+    """Copy items keeping only the given fields (plus keep), in that order"""
+    wanted = tuple(fields) + tuple(field for field in keep if field not in fields)
+    return [{field: item[field] for field in wanted if field in item} for item in items]
+
+
+def normalize_name(name):
+    """Normalize an ingredient/category/area name for lookups ('Chicken_Breast ' -> 'chicken breast')"""
+    if not name:
+        return ''
+    return ' '.join(name.replace('_', ' ').split()).lower()
+
+
+def clean_field(value):
+    """Strip a TheMealDB string field, treating None/'null' as empty"""
+    if not value:
+        return ''
+    value = value.strip()
+    return '' if value.lower() == 'null' else value
+
+
+def run_concurrently(tasks, max_workers=8):
+    """Run callables concurrently and return their results in the same order
+
+    Each task runs inside the current app context, so it may use current_app
+    and the database session like regular request code.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+
+    tasks = list(tasks)
+    if len(tasks) <= 1:
+        return [task() for task in tasks]
+
+    app = current_app._get_current_object()
+
+    def run(task):
+        with app.app_context():
+            return task()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        return list(executor.map(run, tasks))
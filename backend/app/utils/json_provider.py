@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, the stdlib encoder is used without it
+    orjson = None
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed
+
+    Output decodes to the same values as the default provider (sorted keys,
+    dates as HTTP dates, indented in debug mode); non-string keys are sorted
+    as strings and non-ASCII text is written as UTF-8 instead of escaped. Objects with a to_dict() method (e.g. Recipe)
+    are serialized through it.
+    """
+
+    # Leave dates to default() so they are formatted exactly like the stdlib path
+    ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    @staticmethod
+    def default(o):
+        if hasattr(o, 'to_dict'):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def dumps_bytes(self, obj, pretty=False):
+        """Encode obj as UTF-8 JSON bytes"""
+        if orjson is not None:
+            option = self.ORJSON_OPTIONS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option)
+
+        kwargs = {'indent': 2} if pretty else {'separators': (',', ':')}
+        return self.dumps(obj, **kwargs).encode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def encode_body(self, obj):
+        """Response body bytes for obj"""
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self.dumps_bytes(obj, pretty) + b'\n'
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode_body(obj), mimetype=self.mimetype)
+
+
+class EncodedResponseCache:
+    """Bounded LRU of encoded JSON response bodies
+
+    Each entry keeps the object its body was built from (a shared, read-only
+    value such as a cached Recipe or category list) and is reused only while
+    the route is handed that very object again, so it can never go stale.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (source object, body bytes)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+
+    def init_app(self, app):
+        self.max_entries = app.config['ENCODED_RESPONSE_CACHE_MAX_ENTRIES']
+
+    def response(self, key, source, payload):
+        """JSON response for payload, reusing the body encoded for key while source is unchanged"""
+        body = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is source:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                body = entry[1]
+            else:
+                self._counters['misses'] += 1
+
+        if body is None:
+            body = current_app.json.encode_body(payload)
+            if self.max_entries > 0:
+                with self._lock:
+                    self._entries[key] = (source, body)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+
+        return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=sum(len(body) for _, body in self._entries.values()),
+                encoder='orjson' if orjson is not None else 'json'
+            )
+
+
+# Shared encoded body cache (initialized in create_app)
+encoded_responses = EncodedResponseCache()
@@ -0,0 +1,137 @@
+"""
+Shared pytest fixtures: an app on a throwaway SQLite database and a stub TheMealDB client
+"""
+
+import copy
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+from app import create_app, db
+
+
+def make_meal(recipe_id, name, category, area, ingredients, tags=''):
+    """Raw TheMealDB lookup.php meal; ingredients is a list of (ingredient, measure)"""
+    meal = {
+        'idMeal': recipe_id,
+        'strMeal': name,
+        'strCategory': category,
+        'strArea': area,
+        'strInstructions': f'Cook the {name.lower()}.',
+        'strMealThumb': f'http://img/{recipe_id}.jpg',
+        'strTags': tags or None,
+        'strYoutube': '',
+        'strSource': None
+    }
+    for i in range(1, 21):
+        ingredient, measure = ingredients[i - 1] if i <= len(ingredients) else ('', '')
+        meal[f'strIngredient{i}'] = ingredient
+        meal[f'strMeasure{i}'] = measure
+    return meal
+
+
+MEALS = [
+    make_meal('52700', 'Chicken Curry', 'Chicken', 'Indian',
+              [('Chicken', '500g'), ('Onion', '2'), ('Garlic', '3 cloves'), ('Rice', '1 cup')], 'Curry,Spicy'),
+    make_meal('52701', 'Chicken Tikka', 'Chicken', 'Indian',
+              [('Chicken', '400g'), ('Yogurt', '200ml'), ('Garlic', '2 cloves')], 'Spicy'),
+    make_meal('52702', 'Beef Lasagne', 'Beef', 'Italian',
+              [('Beef', '500g'), ('Onion', '1'), ('Tomato', '400g'), ('Lasagne Sheets', '12')]),
+    make_meal('52703', 'Beef Stew', 'Beef', 'British',
+              [('Beef', '1kg'), ('Onion', '2'), ('Carrot', '3')], 'Stew'),
+    make_meal('52704', 'Apple Crumble', 'Dessert', 'British',
+              [('Apple', '4'), ('Butter', '100g'), ('Flour', '150g'), ('Sugar', '75g')], 'Pudding'),
+]
+
+
+class StubMealDBClient:
+    """In-memory stand-in for UpstreamClient answering the TheMealDB endpoints CatalogSync and search use"""
+
+    def __init__(self, meals):
+        self.meals = {meal['idMeal']: copy.deepcopy(meal) for meal in meals}
+        self.calls = []
+
+    def get_json(self, endpoint, params=None):
+        params = params or {}
+        self.calls.append((endpoint, params))
+        meals = list(self.meals.values())
+        if endpoint == 'categories.php':
+            names = dict.fromkeys(meal['strCategory'] for meal in meals)
+            return {'categories': [
+                {'idCategory': str(i), 'strCategory': name, 'strCategoryThumb': None, 'strCategoryDescription': ''}
+                for i, name in enumerate(names, start=1)
+            ]}
+        if endpoint == 'list.php' and params.get('a') == 'list':
+            return {'meals': [{'strArea': area} for area in dict.fromkeys(meal['strArea'] for meal in meals)]}
+        if endpoint == 'filter.php' and 'c' in params:
+            return {'meals': [
+                {'idMeal': meal['idMeal'], 'strMeal': meal['strMeal'], 'strMealThumb': meal['strMealThumb']}
+                for meal in meals if meal['strCategory'] == params['c']
+            ] or None}
+        if endpoint == 'search.php':
+            query = params.get('s', '').strip().lower()
+            return {'meals': [copy.deepcopy(meal) for meal in meals if query in meal['strMeal'].lower()] or None}
+        if endpoint == 'lookup.php':
+            meal = self.meals.get(params.get('i'))
+            return {'meals': [copy.deepcopy(meal)] if meal else None}
+        raise AssertionError(f'Unexpected call {endpoint} {params}')
+
+
+def reset_indexes():
+    """Make in-memory recipe indexes reload from the current app's catalog"""
+    from app.service.recipe_index import _indexes
+
+    for index in _indexes:
+        index._checked_at = None
+        index._version = None
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App on an empty SQLite database serving recipes from the local catalog"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'RECIPE_BACKEND': 'local',
+        'RANDOM_POOL_SIZE': 0
+    })
+    reset_indexes()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """(app, stub client) in the default API mode, with upstream calls answered by the stub"""
+    from app.service.cache import response_cache
+    from app.service.http_client import upstream_client
+
+    client = StubMealDBClient(MEALS)
+    monkeypatch.setattr(upstream_client, 'get_json', client.get_json)
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'RECIPE_BACKEND': 'api',
+        'RANDOM_POOL_SIZE': 0
+    })
+    response_cache.clear()
+    reset_indexes()
+    yield app, client
+    response_cache.clear()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def catalog(app):
+    """Stub client whose meals have been synced into the local catalog"""
+    from app.service.catalog_service import CatalogSync
+
+    client = StubMealDBClient(MEALS)
+    with app.app_context():
+        CatalogSync(client=client, workers=2, batch_size=2).run(log=lambda message: None)
+    return client
@@ -0,0 +1,121 @@
+"""
+Tests for the local recipe catalog: CatalogSync against a stub TheMealDB client,
+and every RecipeService method served from the catalog (RECIPE_BACKEND = 'local')
+"""
+
+from conftest import MEALS, make_meal
+from app import db
+from app.models import CatalogRecipe, CatalogRecipeIngredient, CatalogIngredient, CatalogCategory, CatalogArea
+from app.service.catalog_service import CatalogSync
+from app.service.recipe_service import RecipeService
+
+
+def ingredient_lines(recipe_id):
+    rows = CatalogRecipeIngredient.query.filter_by(recipe_id=recipe_id).order_by(CatalogRecipeIngredient.position)
+    return [(row.position, row.ingredient.name, row.measure) for row in rows]
+
+
+def test_catalog_sync(app, catalog):
+    """A full sync mirrors every category, area, recipe and ingredient line"""
+    with app.app_context():
+        assert CatalogRecipe.query.count() == len(MEALS)
+        assert {c.name for c in CatalogCategory.query} == {'Chicken', 'Beef', 'Dessert'}
+        assert {a.name for a in CatalogArea.query} == {'Indian', 'Italian', 'British'}
+
+        curry = db.session.get(CatalogRecipe, '52700')
+        assert curry.category.name == 'Chicken' and curry.area.name == 'Indian'
+        assert sorted(tag.name for tag in curry.tags) == ['Curry', 'Spicy']
+        assert ingredient_lines('52700') == [
+            (1, 'Chicken', '500g'), (2, 'Onion', '2'), (3, 'Garlic', '3 cloves'), (4, 'Rice', '1 cup')
+        ]
+        # Ingredients are shared between recipes
+        assert CatalogIngredient.query.filter_by(normalized_name='onion').count() == 1
+
+
+def test_catalog_resync(app, catalog):
+    """A second sync updates changed recipes in place, including their ingredient rows"""
+    with app.app_context():
+        synced_at = db.session.get(CatalogRecipe, '52700').synced_at
+        before = RecipeService().get_recipe_by_id('52700')['data']
+
+    catalog.meals['52700'] = make_meal(
+        '52700', 'Chicken Curry', 'Chicken', 'Indian',
+        [('Chicken', '600g'), ('Garlic', '4 cloves'), ('Coconut Milk', '400ml')], 'Curry'
+    )
+    catalog.meals['52705'] = make_meal('52705', 'Pancakes', 'Dessert', 'American', [('Flour', '100g'), ('Egg', '2')])
+
+    with app.app_context():
+        stats = CatalogSync(client=catalog, workers=2, batch_size=2).run(log=lambda message: None)
+        assert stats['recipes'] == len(MEALS) + 1 and stats['failed'] == 0
+        assert CatalogRecipe.query.count() == len(MEALS) + 1
+
+        assert ingredient_lines('52700') == [(1, 'Chicken', '600g'), (2, 'Garlic', '4 cloves'), (3, 'Coconut Milk', '400ml')]
+        assert CatalogRecipeIngredient.query.filter_by(recipe_id='52700').count() == 3
+        assert [tag.name for tag in db.session.get(CatalogRecipe, '52700').tags] == ['Curry']
+        assert db.session.get(CatalogRecipe, '52700').synced_at > synced_at
+        # Unchanged recipes keep their lines
+        assert ingredient_lines('52701') == [(1, 'Chicken', '400g'), (2, 'Yogurt', '200ml'), (3, 'Garlic', '2 cloves')]
+
+        # The processed recipe is rebuilt for the new version
+        after = RecipeService().get_recipe_by_id('52700')['data']
+        assert after is not before
+        assert [item['measure'] for item in after['ingredients']] == ['600g', '4 cloves', '400ml']
+
+
+def test_local_recipe_service(app, catalog):
+    """Every RecipeService method answers from the local catalog"""
+    with app.app_context():
+        service = RecipeService()
+        assert service.is_local
+
+        result = service.search_by_name('chicken')
+        assert result['success'] and {meal['idMeal'] for meal in result['data']} == {'52700', '52701'}
+        assert service.search_by_name('chiken', fuzzy=False)['data'] == []
+        assert service.search_by_name('chiken')['fuzzy']
+
+        result = service.fuzzy_search('lasagna')
+        assert result['success'] and result['data'][0]['idMeal'] == '52702'
+
+        result = service.full_text_search('garlic')
+        assert result['success'] and {meal['idMeal'] for meal in result['data']} == {'52700', '52701'}
+
+        result = service.get_recipe_by_id('52702')
+        assert result['success']
+        recipe = result['data']
+        assert (recipe['name'], recipe['category'], recipe['area']) == ('Beef Lasagne', 'Beef', 'Italian')
+        assert recipe['ingredients'][3].to_dict() == {'ingredient': 'Lasagne Sheets', 'measure': '12'}
+        assert service.get_recipe_by_id('52702')['data'] is recipe
+        assert service.get_recipe_by_id('99999') == {'success': False, 'error': 'Recipe not found', 'data': None}
+
+        assert service.peek_recipe('52702')['data'] is recipe
+        assert service.peek_recipe('99999') is None
+
+        summaries = service.peek_recipe_summaries(['52703', '99999'])
+        assert summaries == {'52703': {
+            'name': 'Beef Stew', 'image': 'http://img/52703.jpg', 'category': 'Beef', 'area': 'British'
+        }}
+
+        result = service.get_recipes_by_ids(['52700', '52704', '99999', '52700'])
+        assert [item['id'] for item in result['data']] == ['52700', '52704']
+        assert result['not_found'] == ['99999'] and result['failed'] == []
+
+        result = service.search_by_ingredient('Onion')
+        assert {meal['idMeal'] for meal in result['data']} == {'52700', '52702', '52703'}
+        assert service.search_by_ingredient('Saffron')['data'] == []
+
+        assert {meal['idMeal'] for meal in service.filter_by_category('beef')['data']} == {'52702', '52703'}
+        assert {meal['idMeal'] for meal in service.filter_by_area('British')['data']} == {'52703', '52704'}
+
+        assert [c['strCategory'] for c in service.get_categories()['data']] == ['Chicken', 'Beef', 'Dessert']
+        assert [a['strArea'] for a in service.get_areas()['data']] == ['British', 'Indian', 'Italian']
+
+        assert service.get_random_recipe()['data']['id'] in {meal['idMeal'] for meal in MEALS}
+        assert service.fetch_random_recipe()['data']['id'] in {meal['idMeal'] for meal in MEALS}
+
+        result = service.advanced_search(query='chicken', ingredients=['Garlic'], category='Chicken', area='Indian')
+        assert [meal['idMeal'] for meal in result['data']] == ['52700', '52701']
+        assert all(meal['match_count'] == 4 for meal in result['data'])
+        result = service.advanced_search(ingredients=['Beef', 'Carrot'], match_all=False)
+        assert [(meal['idMeal'], meal['match_count']) for meal in result['data']] == [('52703', 2), ('52702', 1)]
+
+        assert sorted(recipe['id'] for recipe in service.iter_catalog_recipes()) == sorted(meal['idMeal'] for meal in MEALS)
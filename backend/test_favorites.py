@@ -0,0 +1,133 @@
+"""
+Tests for favorites bookkeeping: add/toggle/remove/import/backfill must keep the
+favorite_daily_counts rollup, recipe_popularity and idempotent replays in step
+with the favorites table
+"""
+
+from collections import Counter
+import pytest
+from conftest import make_meal
+from app import db
+from app.models import User, Favorite, FavoriteDailyCount, RecipePopularity
+from app.service.catalog_service import CatalogSync
+from app.service.favorite_backfill import favorite_backfill
+from app.service.popularity import popularity_tracker
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Recipe IDs handed to the backfill worker (run by hand instead of in its thread)"""
+    recipe_ids = []
+    monkeypatch.setattr(favorite_backfill, 'enqueue', recipe_ids.append)
+    return recipe_ids
+
+
+def auth_headers(app, username, key=None):
+    with app.app_context():
+        user = User(username, f'{username}@example.com', 'secret123')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f"Bearer {user.generate_tokens()['access_token']}"}
+    if key:
+        headers['Idempotency-Key'] = key
+    return headers
+
+
+def assert_consistent(app):
+    """Rollup, persisted popularity and in-memory leaderboard all match the favorites table"""
+    with app.app_context():
+        favorites = Favorite.query.all()
+
+        per_day = Counter((favorite.user_id, favorite.created_at.date()) for favorite in favorites)
+        rollup = {(row.user_id, row.day): row.count for row in FavoriteDailyCount.query if row.count}
+        assert rollup == dict(per_day)
+        assert all(row.count >= 0 for row in FavoriteDailyCount.query)
+
+        popularity_tracker.refresh()
+        per_recipe = Counter(favorite.recipe_id for favorite in favorites)
+        stored = {row.recipe_id: row.favorite_count for row in RecipePopularity.query if row.favorite_count}
+        assert stored == dict(per_recipe)
+        assert {item['idMeal']: item['favorite_count'] for item in popularity_tracker.top(limit=100)} == dict(per_recipe)
+
+
+def test_favorite_counters_stay_consistent(app, catalog, enqueued):
+    client = app.test_client()
+    alice = auth_headers(app, 'alice')
+    bob = auth_headers(app, 'bob')
+
+    # Add, with an idempotent replay
+    keyed = dict(alice, **{'Idempotency-Key': 'add-52700'})
+    first = client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=keyed)
+    replay = client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=keyed)
+    assert first.status_code == replay.status_code == 201
+    assert replay.json == first.json
+    assert first.json['data']['recipe_name'] == 'Chicken Curry'
+    assert client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=alice).status_code == 409
+    assert client.post('/api/favorites/add', json={'recipe_id': '52701'}, headers=alice).status_code == 201
+    assert client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=bob).status_code == 201
+    assert_consistent(app)
+
+    # Toggle on, replayed toggle must not flip it back, plain toggle turns it off again
+    keyed = dict(bob, **{'Idempotency-Key': 'toggle-52702'})
+    assert client.post('/api/favorites/toggle', json={'recipe_id': '52702'}, headers=keyed).json['action'] == 'added'
+    assert client.post('/api/favorites/toggle', json={'recipe_id': '52702'}, headers=keyed).json['action'] == 'added'
+    assert client.get('/api/favorites/check/52702', headers=bob).json['is_favorite']
+    assert_consistent(app)
+    assert client.post('/api/favorites/toggle', json={'recipe_id': '52702'}, headers=bob).json['action'] == 'removed'
+    # A key is bound to the endpoint it was first used with
+    assert client.post('/api/favorites/add', json={'recipe_id': '52702'}, headers=keyed).status_code == 422
+
+    # Remove
+    assert client.delete('/api/favorites/remove/52701', headers=alice).status_code == 200
+    assert client.delete('/api/favorites/remove/52701', headers=alice).status_code == 404
+    assert_consistent(app)
+
+    # Import: known, duplicate, dated, unknown (pending) and invalid lines
+    body = '\n'.join([
+        '52703',
+        '52700',
+        '{"recipe_id": "52704", "created_at": "2024-01-02T03:04:05"}',
+        '77777',
+        '88888',
+        'bad line {'
+    ])
+    response = client.post('/api/favorites/import', data=body, headers=bob)
+    assert response.status_code == 200
+    assert response.json['data'] == {'received': 5, 'imported': 4, 'skipped': 1, 'invalid': 1}
+    assert enqueued == ['77777', '88888']
+    assert_consistent(app)
+
+    # Backfill: 77777 shows up in the catalog, 88888 does not exist
+    catalog.meals['77777'] = make_meal('77777', 'Fish Pie', 'Seafood', 'British', [('Cod', '400g')])
+    with app.app_context():
+        CatalogSync(client=catalog, workers=2).run(log=lambda message: None)
+        for recipe_id in enqueued:
+            favorite_backfill.backfill(recipe_id)
+        resolved = Favorite.query.filter_by(recipe_id='77777').one()
+        assert (resolved.recipe_name, resolved.recipe_image) == ('Fish Pie', 'http://img/77777.jpg')
+        assert Favorite.query.filter_by(recipe_id='88888').count() == 0
+    assert_consistent(app)
+
+    with app.app_context():
+        assert db.session.get(RecipePopularity, '77777').category == 'Seafood'
+
+    stats = client.get('/api/favorites/stats', headers=bob).json['data']
+    assert stats['total_favorites'] == 4
+    assert {'date': '2024-01-02', 'count': 1} in stats['recent_activity']
+
+
+def test_stats_before_rollup_is_seeded(app, catalog, enqueued):
+    """Favorites written before the rollup existed are counted, and removing one never goes negative"""
+    client = app.test_client()
+    alice = auth_headers(app, 'alice')
+    for recipe_id in ('52700', '52701', '52702'):
+        client.post('/api/favorites/add', json={'recipe_id': recipe_id}, headers=alice)
+
+    with app.app_context():
+        FavoriteDailyCount.query.delete()
+        db.session.commit()
+
+    assert client.get('/api/favorites/stats', headers=alice).json['data']['total_favorites'] == 3
+    assert client.delete('/api/favorites/remove/52700', headers=alice).status_code == 200
+    assert client.get('/api/favorites/stats', headers=alice).json['data']['total_favorites'] == 2
+    assert_consistent(app)
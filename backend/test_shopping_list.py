@@ -0,0 +1,91 @@
+"""
+Table-driven tests for shopping list measure parsing and aggregation
+"""
+
+import pytest
+from app.service.shopping_list import parse_measure, format_quantity, aggregate_ingredients
+
+
+@pytest.mark.parametrize('measure, expected', [
+    # Plain numbers and units
+    ('500g', (500.0, 'g')),
+    ('500 g', (500.0, 'g')),
+    ('1.5l', (1500.0, 'ml')),
+    ('200ml', (200.0, 'ml')),
+    ('1 lb', (453.59, 'g')),
+    ('2 fl oz', (59.14, 'ml')),
+    ('1 kg', (1000.0, 'g')),
+    ('2 Tbsp.', (30.0, 'ml')),
+    # Fractions
+    ('1/2 tsp', (2.5, 'ml')),
+    ('1 1/2 cups', (360.0, 'ml')),
+    ('1 1/2', (1.5, '')),
+    ('½ cup', (120.0, 'ml')),
+    ('1½ tbsp', (22.5, 'ml')),
+    ('3/0 cup', (0.0, 'ml')),
+    # Thousands separator vs decimal comma
+    ('1,000', (1000.0, '')),
+    ('1,000g', (1000.0, 'g')),
+    ('1,000,000 ml', (1000000.0, 'ml')),
+    ('1,5 kg', (1500.0, 'g')),
+    ('12,50g', (12.5, 'g')),
+    # Ranges use the upper bound
+    ('1-2', (2.0, '')),
+    ('2-3 tbs', (45.0, 'ml')),
+    ('2 to 3 cloves', (3.0, 'clove')),
+    # Multiplied packs
+    ('2 x 400g', (800.0, 'g')),
+    ('2 x 400g tins', (800.0, 'g')),
+    # Countable units, with or without a number
+    ('3 cloves', (3.0, 'clove')),
+    ('1 can', (1.0, 'can')),
+    ('Pinch', (1.0, 'pinch')),
+    ('pinch of salt', (1.0, 'pinch')),
+    ('2 Large', (2.0, '')),
+    # No quantity
+    ('to taste', (None, None)),
+    ('', (None, None)),
+    ('   ', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_measure(measure, expected):
+    quantity, unit = parse_measure(measure)
+    assert unit == expected[1]
+    if expected[0] is None:
+        assert quantity is None
+    else:
+        assert quantity == pytest.approx(expected[0])
+
+
+@pytest.mark.parametrize('quantity, unit, expected', [
+    (1500.0, 'g', (1.5, 'kg')),
+    (2500.0, 'ml', (2.5, 'l')),
+    (999.0, 'ml', (999.0, 'ml')),
+    (2.3333, '', (2.33, '')),
+    (1200.0, 'clove', (1200.0, 'clove')),
+])
+def test_format_quantity(quantity, unit, expected):
+    assert format_quantity(quantity, unit) == expected
+
+
+def test_aggregate_ingredients():
+    recipes = [
+        {'name': 'Curry', 'ingredients': [
+            {'ingredient': 'Chicken', 'measure': '500g'},
+            {'ingredient': 'Garlic', 'measure': '3 cloves'},
+            {'ingredient': 'Salt', 'measure': 'to taste'},
+        ]},
+        {'name': 'Tikka', 'ingredients': [
+            {'ingredient': 'chicken ', 'measure': '1 kg'},
+            {'ingredient': 'Garlic', 'measure': '2 cloves'},
+            {'ingredient': 'Milk', 'measure': '1 cup'},
+        ]},
+    ]
+    items = {(item['ingredient'].lower(), item['unit']): item for item in aggregate_ingredients(recipes)}
+
+    assert items[('chicken', 'kg')]['quantity'] == 1.5
+    assert items[('chicken', 'kg')]['recipes'] == ['Curry', 'Tikka']
+    assert items[('garlic', 'clove')]['quantity'] == 5
+    assert items[('milk', 'ml')]['quantity'] == 240
+    assert items[('salt', None)]['quantity'] is None
+    assert items[('salt', None)]['notes'] == ['to taste']
@@ -0,0 +1,111 @@
+"""
+Tests for the upstream client's circuit breaker, against a stub HTTP session
+"""
+
+import pytest
+import requests
+import app.service.http_client as http_client
+from app.service.http_client import CircuitBreaker, CircuitOpenError, UpstreamClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class StubResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} error', response=self)
+
+    def json(self):
+        return {'meals': None}
+
+
+class StubSession:
+    """Answers with the queued outcomes: a status code or an exception to raise"""
+
+    def __init__(self):
+        self.outcomes = []
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        return StubResponse(outcome)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http_client, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def client():
+    client = UpstreamClient()
+    client.base_url = 'http://stub'
+    client.session = StubSession()
+    client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    return client
+
+
+def test_opens_after_threshold_failures(clock, client):
+    client.session.outcomes = [requests.exceptions.ConnectionError('down')] * 2 + [503]
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.RequestException):
+            client.get_json('lookup.php', {'i': '1'})
+    assert client.breaker.to_dict() == {'state': 'open', 'failures': 3, 'failure_threshold': 3, 'retry_in_seconds': 30.0}
+
+    # Refused without touching the network
+    with pytest.raises(CircuitOpenError):
+        client.get_json('lookup.php', {'i': '1'})
+    assert client.session.calls == 3
+
+
+def test_half_open_after_cooldown(clock, client):
+    client.session.outcomes = [requests.exceptions.Timeout('slow')] * 3
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get_json('lookup.php')
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        client.get_json('lookup.php')
+
+    # Cooldown over: exactly one probe goes through
+    clock.now += 1
+    client.breaker.before_call()
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        client.breaker.before_call()
+
+    # A failed probe opens it again for a full cooldown
+    client.breaker.record_failure()
+    assert client.breaker.to_dict()['retry_in_seconds'] == 30.0
+
+    clock.now += 30
+    assert client.get_json('lookup.php') == {'meals': None}
+    assert client.breaker.to_dict()['state'] == 'closed'
+    assert client.breaker.failures == 0
+
+
+def test_client_errors_count_as_success(clock, client):
+    client.session.outcomes = [requests.exceptions.ConnectionError('down')] * 2 + [404] * 5
+    for _ in range(7):
+        with pytest.raises(requests.exceptions.RequestException):
+            client.get_json('lookup.php')
+
+    # The upstream answered the 4xx requests, so the breaker stays closed and resets its count
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.breaker.failures == 0
+    assert client.session.calls == 7
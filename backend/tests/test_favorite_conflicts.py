@@ -0,0 +1,67 @@
+"""
+Tests for conflict reporting on favorite writes: Idempotency-Key races versus
+duplicate favorite rows
+"""
+
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import User, Favorite, IdempotencyKey
+import app.routes.favorites as favorites_routes
+
+
+def auth_headers(app, username):
+    with app.app_context():
+        user = User(username, f'{username}@example.com', 'secret123')
+        db.session.add(user)
+        db.session.commit()
+        return {'Authorization': f"Bearer {user.generate_tokens()['access_token']}"}
+
+
+def test_concurrent_idempotency_key_is_409_and_rolls_back(app, catalog, monkeypatch):
+    client = app.test_client()
+    headers = dict(auth_headers(app, 'alice'), **{'Idempotency-Key': 'race'})
+    client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=headers)
+
+    # The second request checks the key before the first one stored it
+    monkeypatch.setattr(favorites_routes, 'find_idempotent_response', lambda *args: None)
+    response = client.post('/api/favorites/add', json={'recipe_id': '52701'}, headers=headers)
+    assert response.status_code == 409
+    assert 'Idempotency-Key' in response.json['error']
+
+    response = client.post('/api/favorites/toggle', json={'recipe_id': '52702'}, headers=headers)
+    assert response.status_code == 409
+
+    with app.app_context():
+        assert [favorite.recipe_id for favorite in Favorite.query] == ['52700']
+        assert IdempotencyKey.query.count() == 1
+
+
+def test_duplicate_favorite_is_not_reported_as_key_conflict(app, catalog, monkeypatch):
+    client = app.test_client()
+    headers = auth_headers(app, 'bob')
+    assert client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=headers).status_code == 201
+
+    response = client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=headers)
+    assert response.status_code == 409
+    assert response.json['error'] == 'Recipe is already in your favorites'
+
+    # Toggle racing another insert: its DELETE saw nothing, then the INSERT hits the existing row
+    monkeypatch.setattr(favorites_routes, 'remove_favorite', lambda user_id, recipe_id: False)
+    response = client.post('/api/favorites/toggle', json={'recipe_id': '52700'}, headers=headers)
+    assert response.status_code == 200
+    assert (response.json['action'], response.json['is_favorite']) == ('none', True)
+
+    with app.app_context():
+        assert Favorite.query.filter_by(recipe_id='52700').count() == 1
+
+
+def test_other_constraint_failures_are_not_blamed_on_the_key(app, catalog, monkeypatch):
+    def failing_add(values):
+        raise IntegrityError('INSERT INTO favorites', {}, Exception('FOREIGN KEY constraint failed'))
+
+    client = app.test_client()
+    headers = auth_headers(app, 'carol')
+    monkeypatch.setattr(favorites_routes, 'add_favorite', failing_add)
+    response = client.post('/api/favorites/add', json={'recipe_id': '52700'}, headers=headers)
+    assert response.status_code == 500
+    assert 'Idempotency-Key' not in response.json['error']
@@ -0,0 +1,62 @@
+"""
+Tests for NDJSON favorites import/export: malformed lines are rejected one by one
+instead of failing the whole import
+"""
+
+import json
+import pytest
+from app import db
+from app.models import User, Favorite
+from app.service.favorite_backfill import favorite_backfill
+
+
+@pytest.fixture(autouse=True)
+def no_backfill(monkeypatch):
+    monkeypatch.setattr(favorite_backfill, 'enqueue', lambda recipe_id: None)
+
+
+def create_user(app, username):
+    with app.app_context():
+        user = User(username, f'{username}@example.com', 'secret123')
+        db.session.add(user)
+        db.session.commit()
+        return user.id, {'Authorization': f"Bearer {user.generate_tokens()['access_token']}"}
+
+
+def test_wrongly_typed_lines_are_rejected_per_line(app, catalog):
+    client = app.test_client()
+    user_id, headers = create_user(app, 'alice')
+    body = '\n'.join([
+        '52700',
+        '{"recipe_id": "52701", "created_at": 123}',
+        '{"recipe_id": "52702", "recipe_name": "Lasagne", "recipe_image": ["x"]}',
+        '{"recipe_id": "52702", "recipe_name": 5}',
+        '{"recipe_id": ["52703"]}',
+        '{"recipe_id": true}',
+        '[1, 2]',
+        '{"recipe_id": 52703, "recipe_name": "Beef Stew", "created_at": "2024-01-02T03:04:05"}',
+    ])
+    response = client.post('/api/favorites/import', data=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json['data'] == {'received': 2, 'imported': 2, 'skipped': 0, 'invalid': 6}
+
+    with app.app_context():
+        assert sorted(favorite.recipe_id for favorite in Favorite.query.filter_by(user_id=user_id)) == ['52700', '52703']
+
+
+def test_export_round_trips_and_checks_the_user(app, catalog):
+    client = app.test_client()
+    user_id, headers = create_user(app, 'bob')
+    assert client.get('/api/favorites/export', headers=headers).data == b''
+
+    client.post('/api/favorites/add', json={'recipe_id': '52704'}, headers=headers)
+    response = client.get('/api/favorites/export', headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [(line['recipe_id'], line['recipe_name']) for line in lines] == [('52704', 'Apple Crumble')]
+
+    with app.app_context():
+        Favorite.query.filter_by(user_id=user_id).delete()
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    assert client.get('/api/favorites/export', headers=headers).status_code == 404
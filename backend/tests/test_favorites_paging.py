@@ -0,0 +1,50 @@
+"""
+Tests for paging through favorites with ?limit and ?cursor
+"""
+
+import pytest
+from app import db
+from app.models import User
+
+
+@pytest.fixture
+def favorites_client(app, catalog, monkeypatch):
+    """(client, auth headers) of a user with five favorites"""
+    from app.service.favorite_backfill import favorite_backfill
+
+    monkeypatch.setattr(favorite_backfill, 'enqueue', lambda recipe_id: None)
+    with app.app_context():
+        user = User('alice', 'alice@example.com', 'secret123')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f"Bearer {user.generate_tokens()['access_token']}"}
+
+    client = app.test_client()
+    for recipe_id in ('52700', '52701', '52702', '52703', '52704'):
+        client.post('/api/favorites/add', json={'recipe_id': recipe_id}, headers=headers)
+    return client, headers
+
+
+@pytest.mark.parametrize('limit', ['0', '-3', '1'])
+def test_limit_below_one_is_one(favorites_client, limit):
+    client, headers = favorites_client
+    response = client.get(f'/api/favorites/?limit={limit}', headers=headers)
+    assert response.json['count'] == 1
+    assert response.json['next_cursor']
+
+
+def test_limit_is_capped_and_pages_cover_everything(app, favorites_client):
+    client, headers = favorites_client
+    app.config['FAVORITES_PAGE_MAX'] = 2
+
+    seen = []
+    url = '/api/favorites/?limit=1000'
+    while url:
+        page = client.get(url, headers=headers).json
+        assert page['count'] <= 2
+        seen.extend(favorite['recipe_id'] for favorite in page['data'])
+        url = f"/api/favorites/?limit=1000&cursor={page['next_cursor']}" if page['next_cursor'] else None
+    assert sorted(seen) == ['52700', '52701', '52702', '52703', '52704']
+
+    # Without paging parameters everything comes back at once
+    assert client.get('/api/favorites/', headers=headers).json['count'] == 5
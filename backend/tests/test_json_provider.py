@@ -0,0 +1,78 @@
+"""
+Tests for the orjson-backed JSON provider and the encoded response body cache
+"""
+
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+import app.utils.json_provider as json_provider
+from app.service.cache import response_cache
+from app.utils.json_provider import EncodedResponseCache
+
+PAYLOAD = {
+    'created': datetime(2024, 1, 2, 3, 4, 5),
+    'aware': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'day': date(2024, 1, 2),
+    'counts': {2: 'two', 10: 'ten'},
+    'price': Decimal('1.50'),
+    'token': uuid.UUID(int=1),
+    'list': [1.5, None, True, 'naïve'],
+}
+
+
+class Dumpable:
+    def to_dict(self):
+        return {'id': '52700', 'when': date(2024, 1, 2)}
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason='orjson not installed')
+def test_orjson_matches_default_provider(app):
+    default = DefaultJSONProvider(app)
+    with app.app_context():
+        for obj in (PAYLOAD, {'recipe': Dumpable()}):
+            fast = app.json.dumps_bytes(obj)
+            stdlib = default.dumps(obj, default=app.json.default)
+            assert json.loads(fast) == json.loads(stdlib)
+            assert app.json.loads(fast) == default.loads(stdlib)
+
+        # With string keys the bytes are the same (orjson writes UTF-8 instead of \u escapes)
+        obj = {key: value for key, value in PAYLOAD.items() if key != 'counts'}
+        assert app.json.dumps_bytes(obj) == default.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+        assert app.json.loads(app.json.dumps_bytes(PAYLOAD))['created'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
+
+
+def test_stdlib_fallback(app, monkeypatch):
+    with app.app_context():
+        fast = app.json.dumps_bytes(PAYLOAD)
+        monkeypatch.setattr(json_provider, 'orjson', None)
+        assert json.loads(app.json.dumps_bytes(PAYLOAD)) == json.loads(fast)
+        assert app.json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+
+
+def test_encoded_body_follows_its_source(app):
+    cache = EncodedResponseCache()
+    first = {'name': 'Curry'}
+    with app.app_context():
+        assert json.loads(cache.response('k', first, {'data': first}).data) == {'data': {'name': 'Curry'}}
+        cache.response('k', first, {'data': first})
+        assert cache.stats()['hits'] == 1
+
+        # A new source object (e.g. a refreshed cache entry) is encoded again
+        second = {'name': 'Curry v2'}
+        assert json.loads(cache.response('k', second, {'data': second}).data) == {'data': {'name': 'Curry v2'}}
+        assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 2)
+
+
+def test_recipe_detail_reencoded_after_upstream_change(upstream):
+    app, stub = upstream
+    client = app.test_client()
+    assert client.get('/api/recipes/52703').json['data']['name'] == 'Beef Stew'
+    assert client.get('/api/recipes/52703').json['data']['name'] == 'Beef Stew'
+
+    # The cached response expires and TheMealDB now has a new name
+    stub.meals['52703']['strMeal'] = 'Irish Beef Stew'
+    response_cache.clear()
+    assert client.get('/api/recipes/52703').json['data']['name'] == 'Irish Beef Stew'
@@ -0,0 +1,37 @@
+"""
+Tests for ?fields= projection of list responses
+"""
+
+from app.utils.helpers import SUMMARY_FIELDS
+
+
+def test_summary_omits_heavy_fields(app, catalog):
+    client = app.test_client()
+    data = client.get('/api/recipes/search?q=chicken').json['data']
+    assert [item['idMeal'] for item in data] == ['52700', '52701']
+    assert all(set(item) == set(SUMMARY_FIELDS) for item in data)
+
+    full = client.get('/api/recipes/search?q=chicken&fields=all').json['data']
+    assert all(item['strInstructions'] and item['strIngredient1'] == 'Chicken' for item in full)
+
+    # Ranking info stays in the summary shape
+    ranked = client.get('/api/recipes/search?q=chicken&mode=local').json['data']
+    assert all(set(item) == set(SUMMARY_FIELDS) | {'score'} for item in ranked)
+
+
+def test_fields_with_local_mode(app, catalog):
+    client = app.test_client()
+    response = client.get('/api/recipes/search?q=curry&mode=local&fields=strMeal, idMeal,strMeal')
+    assert response.status_code == 200
+    assert response.json['data'] == [{'strMeal': 'Chicken Curry', 'idMeal': '52700'}]
+
+
+def test_unknown_fields_are_ignored(app, catalog):
+    client = app.test_client()
+    response = client.get('/api/recipes/search?q=curry&mode=local&fields=idMeal,noSuchField')
+    assert response.status_code == 200
+    assert response.json['data'] == [{'idMeal': '52700'}]
+
+    response = client.get('/api/recipes/search?q=curry&mode=local&fields=noSuchField')
+    assert response.status_code == 200
+    assert response.json['data'] == [{}]
@@ -0,0 +1,49 @@
+"""
+Tests for replacing a whole meal plan week in one PUT
+"""
+
+import pytest
+from app import db
+from app.models import User
+
+
+def auth_headers(app, username):
+    with app.app_context():
+        user = User(username, f'{username}@example.com', 'secret123')
+        db.session.add(user)
+        db.session.commit()
+        return {'Authorization': f"Bearer {user.generate_tokens()['access_token']}"}
+
+
+def test_replace_week(app, catalog):
+    client = app.test_client()
+    headers = auth_headers(app, 'alice')
+    meals = [
+        {'planned_date': '2024-01-01', 'meal_type': 'Dinner', 'recipe_id': '52700'},
+        {'planned_date': '2024-01-03', 'meal_type': 'lunch', 'recipe_id': ' 52704 ', 'recipe_name': 'Crumble'},
+    ]
+    response = client.put('/api/meal-plans/week/2024-01-01', json={'meals': meals}, headers=headers)
+    assert response.status_code == 200
+    assert [(plan['recipe_id'], plan['recipe_name'], plan['meal_type']) for plan in response.json['data']] == [
+        ('52700', 'Chicken Curry', 'dinner'),
+        ('52704', 'Crumble', 'lunch'),
+    ]
+
+    response = client.put('/api/meal-plans/week/2024-01-01', json={'meals': meals[:1]}, headers=headers)
+    assert response.json['count'] == 1
+
+
+@pytest.mark.parametrize('recipe_id', ['', '   ', None, 52700, ['52700'], 'x' * 51])
+def test_invalid_recipe_id_is_400_naming_the_slot(app, catalog, recipe_id):
+    client = app.test_client()
+    headers = auth_headers(app, 'bob')
+    meals = [
+        {'planned_date': '2024-01-01', 'meal_type': 'dinner', 'recipe_id': '52700'},
+        {'planned_date': '2024-01-02', 'meal_type': 'lunch', 'recipe_id': recipe_id},
+    ]
+    response = client.put('/api/meal-plans/week/2024-01-01', json={'meals': meals}, headers=headers)
+    assert response.status_code == 400
+    assert response.json['error'].startswith('Meal 1 (2024-01-02 lunch): recipe_id')
+
+    # Nothing was saved
+    assert client.get('/api/meal-plans/?start=2024-01-01&end=2024-01-07', headers=headers).json['count'] == 0
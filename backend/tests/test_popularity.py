@@ -0,0 +1,57 @@
+"""
+Tests for the in-memory popularity leaderboards: loaded at startup rather than by
+a request, and kept in order as favorite counts change
+"""
+
+import random
+from app import create_app, db
+from app.models import User, Favorite
+from app.service.popularity import PopularityTracker, popularity_tracker
+
+
+def test_counts_are_loaded_at_startup(app, monkeypatch):
+    with app.app_context():
+        alice = User('alice', 'alice@example.com', 'secret123')
+        bob = User('bob', 'bob@example.com', 'secret123')
+        db.session.add_all([alice, bob])
+        db.session.flush()
+        for user, recipe_id in ((alice, '52700'), (bob, '52700'), (alice, '52701')):
+            db.session.add(Favorite(user_id=user.id, recipe_id=recipe_id, recipe_name='Curry'))
+        db.session.commit()
+
+    # A restart on the same database
+    restarted = create_app(dict(app.config))
+
+    def no_refresh():
+        raise AssertionError('refresh() must not run on a request')
+
+    monkeypatch.setattr(popularity_tracker, 'refresh', no_refresh)
+    response = restarted.test_client().get('/api/recipes/popular')
+    assert response.status_code == 200
+    assert [(item['idMeal'], item['favorite_count']) for item in response.json['data']] == [('52700', 2), ('52701', 1)]
+
+    with restarted.app_context():
+        db.session.remove()
+
+
+def test_record_keeps_cached_leaderboards_in_order(monkeypatch):
+    tracker = PopularityTracker(max_results=5)
+    monkeypatch.setattr(tracker, '_ensure_started', lambda: None)
+    recipe_ids = [str(53100 + i) for i in range(20)]
+    tracker._groups = {
+        ('category', 'beef'): set(recipe_ids[::2]),
+        ('area', 'british'): set(recipe_ids[::3]),
+    }
+    rng = random.Random(17)
+    tracker.record({recipe_id: rng.randint(0, 4) for recipe_id in recipe_ids})
+
+    boards = [(None, None), ('beef', None), (None, 'british'), ('beef', 'british')]
+    for _ in range(300):
+        for category, area in boards:
+            tracker.top(limit=5, category=category, area=area)
+        recipe_id = rng.choice(recipe_ids)
+        tracker.record({recipe_id: rng.choice((-1, 1)) if tracker._counts[recipe_id] else 1})
+
+        for key in boards:
+            if key in tracker._top:
+                assert tracker._top[key] == tracker._leaderboard(*key)
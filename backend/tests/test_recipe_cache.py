@@ -0,0 +1,29 @@
+"""
+Tests for reusing processed Recipe objects across requests
+"""
+
+from conftest import make_meal
+from app.service.recipe_data import RecipeCache
+
+
+def test_unchanged_meal_reuses_recipe():
+    cache = RecipeCache()
+    raw = make_meal('53001', 'Shakshuka', 'Vegetarian', 'Egyptian', [('Eggs', '4'), ('Tomato', '400g')])
+    recipe = cache.get(raw)
+    assert cache.get(raw) is recipe
+    # An equal dict, e.g. the same meal fetched again
+    assert cache.get(dict(raw)) is recipe
+
+
+def test_any_changed_field_rebuilds_recipe():
+    cache = RecipeCache()
+    raw = make_meal('53002', 'Koshari', 'Vegetarian', 'Egyptian', [('Lentils', '1 cup'), ('Rice', '1 cup')])
+    cache.get(raw)
+
+    # Same dict object with the same name and instructions: only the content tells it apart
+    raw['strCategory'] = 'Side'
+    assert cache.get(raw).category == 'Side'
+    raw['strMeasure2'] = '2 cups'
+    assert cache.get(raw).ingredients[1].measure == '2 cups'
+    raw['strTags'] = 'Street'
+    assert cache.get(raw).tags == ('Street',)
@@ -0,0 +1,79 @@
+"""
+Tests for stale-while-revalidate in the TheMealDB response cache
+"""
+
+import threading
+import time
+import pytest
+import app.service.cache as cache_module
+from app.service.cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, 'time', clock)
+    return clock
+
+
+def test_stale_entry_served_while_one_refresh_runs(clock):
+    cache = ResponseCache(stale_seconds=60, ttls={'lookup.php': 10})
+    assert cache.get_or_load('lookup.php', {'i': '1'}, lambda: {'v': 1}) == {'v': 1}
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {'v': 2}
+
+    clock.now += 11
+    for _ in range(5):
+        assert cache.get_or_load('lookup.php', {'i': '1'}, slow_loader) == {'v': 1}
+    assert started.wait(2)
+    assert cache.get_or_load('lookup.php', {'i': '1'}, slow_loader) == {'v': 1}
+    assert len(calls) == 1
+
+    release.set()
+    wait_for(lambda: cache.stats()['refreshes'] == 1)
+    assert cache.get('lookup.php?i=1') == ({'v': 2}, True)
+
+
+def test_refresh_error_keeps_stale_value(clock):
+    cache = ResponseCache(stale_seconds=60, ttls={'lookup.php': 10})
+    cache.get_or_load('lookup.php', {'i': '1'}, lambda: {'v': 1})
+
+    def failing_loader():
+        raise ConnectionError('upstream down')
+
+    clock.now += 11
+    assert cache.get_or_load('lookup.php', {'i': '1'}, failing_loader) == {'v': 1}
+    wait_for(lambda: cache.stats()['refresh_errors'] == 1)
+    assert cache.get('lookup.php?i=1') == ({'v': 1}, False)
+
+    # The next stale read tries again
+    assert cache.get_or_load('lookup.php', {'i': '1'}, failing_loader) == {'v': 1}
+    wait_for(lambda: cache.stats()['refresh_errors'] == 2)
+
+    # Past the grace period the value is gone and errors propagate
+    clock.now += 60
+    with pytest.raises(ConnectionError):
+        cache.get_or_load('lookup.php', {'i': '1'}, failing_loader)
@@ -0,0 +1,29 @@
+"""
+Tests for search in the default API mode: recipes returned by search.php feed
+the fuzzy, suggest and pantry indexes
+"""
+
+from conftest import make_meal
+
+
+def test_fuzzy_search_learns_from_exact_search(upstream):
+    app, stub = upstream
+    stub.meals['53000'] = make_meal('53000', 'Moussaka', 'Lamb', 'Greek', [('Aubergine', '2'), ('Lamb Mince', '500g')])
+    client = app.test_client()
+
+    # Nothing has been seen yet: the typo finds nothing
+    response = client.get('/api/recipes/search?q=musaka')
+    assert response.json['fuzzy'] and response.json['count'] == 0
+
+    response = client.get('/api/recipes/search?q=moussaka')
+    assert response.json['count'] == 1 and not response.json['fuzzy']
+
+    response = client.get('/api/recipes/search?q=musaka')
+    assert response.json['fuzzy']
+    assert response.json['data'][0]['idMeal'] == '53000'
+
+    suggestions = client.get('/api/recipes/suggest?prefix=mous').json['data']
+    assert 'Moussaka' in [item['text'] for item in suggestions]
+
+    matches = client.get('/api/recipes/pantry?have=aubergine,lamb mince').json['data']
+    assert '53000' in [item['id'] for item in matches]
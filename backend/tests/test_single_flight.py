@@ -0,0 +1,70 @@
+"""
+Tests for coalescing concurrent identical upstream calls
+"""
+
+import threading
+import time
+from app.service.singleflight import SingleFlight
+
+
+def run_concurrently(flights, key, fn, callers=5):
+    """Call flights.do(key, fn) from several threads once they are all waiting on one call"""
+    results = [None] * callers
+
+    def caller(i):
+        try:
+            results[i] = ('result', flights.do(key, fn))
+        except Exception as e:
+            results[i] = ('error', e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 2
+    while flights.stats()['shared'] < callers - 1:
+        assert time.monotonic() < deadline, 'callers did not join the call'
+        time.sleep(0.005)
+    fn.release.set()
+    for thread in threads:
+        thread.join(2)
+    return results
+
+
+class BlockingCall:
+    """Upstream stand-in that blocks until released, then returns or raises outcome"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(2)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    fn = BlockingCall({'meals': [{'idMeal': '1'}]})
+    results = run_concurrently(flights, 'lookup.php?i=1', fn)
+
+    assert fn.calls == 1
+    assert all(kind == 'result' and value is fn.outcome for kind, value in results)
+    assert flights.stats() == {'calls': 1, 'shared': 4, 'in_flight': 0}
+
+    # Finished calls are not reused
+    assert flights.do('lookup.php?i=1', fn) is fn.outcome
+    assert fn.calls == 2
+
+
+def test_concurrent_callers_see_the_same_exception():
+    flights = SingleFlight()
+    fn = BlockingCall(TimeoutError('upstream timed out'))
+    results = run_concurrently(flights, 'search.php?s=curry', fn)
+
+    assert fn.calls == 1
+    assert all(kind == 'error' and value is fn.outcome for kind, value in results)
+    assert flights.stats()['in_flight'] == 0
@@ -0,0 +1,26 @@
+"""
+Tests for autocomplete ranking by favorite counts
+"""
+
+from sqlalchemy import event
+from app import db
+from app.service.popularity import popularity_tracker
+
+
+def test_suggestions_ranked_by_tracked_favorite_counts(app, catalog):
+    client = app.test_client()
+    popularity_tracker.record({'52701': 3, '52700': 1})
+
+    statements = []
+
+    def before_cursor_execute(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            suggestions = client.get('/api/recipes/suggest?prefix=chicken&types=recipe').json['data']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert [(item['text'], item['popularity']) for item in suggestions] == [('Chicken Tikka', 3), ('Chicken Curry', 1)]
+    assert not [statement for statement in statements if 'favorites' in statement]